@@ -0,0 +1,417 @@
+"""브랜드 블로그 생성 파이프라인 벤치마크
+
+외부 서비스 없이 전체 파이프라인을 재현 가능하게 측정합니다.
+- 크롤링: 저장된 네이버/티스토리/일반 블로그 HTML을 로컬 HTTP 서버로 제공
+  (Chromium host-resolver-rules로 실제 도메인을 로컬 서버에 매핑)
+- 분석/생성: 지연 시간, 토큰 속도, 429 주입을 설정할 수 있는 가짜 Gemini 서버
+- 저장: PostgREST 호환 로컬 스텁 (Supabase insert)
+
+단계별 처리량과 지연 시간 백분위를 출력하고, 기준선(baseline)과 비교해
+성능 회귀가 있으면 종료 코드 1을 반환합니다.
+
+사용 예:
+    python benchmark.py --iterations 20 --save-baseline bench_baseline.json
+    python benchmark.py --iterations 20 --baseline bench_baseline.json
+"""
+import os
+import sys
+import re
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+# 벤치마크 로그가 사용자 데이터 디렉터리를 오염시키지 않도록 임시 디렉터리 사용
+os.environ.setdefault("BRANDBLOG_DATA_DIR", tempfile.mkdtemp(prefix="brandblog-bench-"))
+
+from PyQt5.QtCore import QCoreApplication
+from supabase import create_client
+
+from blog_generator import (CrawlThread, AnalyzeThread, GenerateThread,
+                            MetricsRecorder, insert_project, run_thread_sync, metrics,
+                            create_genai_client, connection_reuse_rates, CrawlPool, CRAWL_WORKERS)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_fixtures")
+
+# 크롤링 대상 URL (host-resolver-rules로 로컬 서버에 매핑됨)
+CRAWL_URLS = {
+    'naver': "http://blog.naver.com/benchblog/223000000001",
+    'tistory': "http://bench.tistory.com/1",
+    'general': "http://bench.example.com/post/1",
+}
+
+# 가짜 Supabase 키 (JWT 형식)
+STUB_SUPABASE_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.YmVuY2g"
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def start_server(handler_class):
+    """핸들러로 로컬 HTTP 서버를 띄우고 (서버, 포트) 반환"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler_class)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[1]
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, content_type):
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'null')
+
+
+class FixtureHandler(QuietHandler):
+    """Host 헤더에 따라 저장된 블로그 HTML을 제공"""
+
+    def do_GET(self):
+        host = (self.headers.get('Host') or '').split(':')[0]
+        if host == 'blog.naver.com':
+            name = 'naver_post.html' if self.path.startswith('/PostView') else 'naver_outer.html'
+        elif host.endswith('tistory.com'):
+            name = 'tistory_post.html'
+        else:
+            name = 'general_post.html'
+        self.send_body(200, read_fixture(name), 'text/html; charset=utf-8')
+
+
+class FakeGeminiConfig:
+    latency = 0.3          # 첫 토큰까지 지연 (초)
+    token_rate = 200.0     # 초당 토큰 수
+    error_rate = 0.0       # 429 응답 비율
+    chunk_tokens = 20      # 스트리밍 청크당 토큰 수
+
+
+def fake_generation(prompt):
+    """프롬프트 종류에 맞는 가짜 응답 텍스트 생성"""
+    if '섹션 본문만' in prompt:
+        match = re.search(r'다음 키워드를 자연스럽게 포함: (.+)', prompt)
+        keywords = match.group(1) if match and match.group(1) != '없음' else ''
+        return f"{keywords} 이야기를 조금 더 자세히 해볼게요. " + "이 부분은 다시 작성된 섹션 본문입니다. " * 12
+    if '분석해주세요' in prompt:
+        return ("1. 제목 패턴: 문제 제기형 + 해결 제시\n2. 서론: 공감형 질문으로 시작\n"
+                "3. 본론: 번호가 붙은 소제목 4개, 각 섹션 4~5문장\n4. 결론: 실천 권유와 댓글 유도 CTA\n"
+                "5. 문체: 친근한 존댓말, 중간 길이 문장")
+    match = re.search(r'- 타겟 키워드: (.*)', prompt)
+    keywords = [k.strip() for k in (match.group(1) if match else '').split(',') if k.strip()]
+    sections = []
+    for i in range(4):
+        keyword = keywords[i % len(keywords)] if keywords else '관리'
+        sections.append(f"{i + 1}. {keyword}에 대해 알아야 할 것\n" +
+                        f"{keyword}는 생각보다 간단하게 시작할 수 있습니다. " * 9)
+    return ("새로운 시작을 위한 가이드\n\n요즘 고민이 많으시죠? 오늘은 차근차근 정리해 봤어요.\n\n" +
+            "\n\n".join(sections) + "\n\n오늘 내용이 도움이 되셨다면 댓글로 알려주세요!")
+
+
+class FakeGeminiHandler(QuietHandler):
+    """Gemini generateContent / streamGenerateContent 호환 가짜 서버"""
+
+    def do_POST(self):
+        match = re.match(r'^/[^/]+/models/([^:]+):(\w+)', self.path)
+        if not match:
+            self.send_body(404, '{}', 'application/json')
+            return
+        model, method = match.groups()
+        request = self.read_json()
+        prompt = ''.join(part.get('text', '')
+                         for content in request.get('contents', [])
+                         for part in content.get('parts', []))
+
+        time.sleep(FakeGeminiConfig.latency)
+        if random.random() < FakeGeminiConfig.error_rate:
+            error = {"error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota).",
+                               "status": "RESOURCE_EXHAUSTED"}}
+            self.send_body(429, json.dumps(error), 'application/json')
+            return
+
+        text = fake_generation(prompt)
+        prompt_tokens = max(1, len(prompt) // 2)
+        output_tokens = max(1, len(text) // 2)
+        usage = {"promptTokenCount": prompt_tokens, "candidatesTokenCount": output_tokens,
+                 "totalTokenCount": prompt_tokens + output_tokens}
+
+        if method == 'generateContent':
+            time.sleep(output_tokens / FakeGeminiConfig.token_rate)
+            body = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]},
+                                    "finishReason": "STOP", "index": 0}],
+                    "usageMetadata": usage, "modelVersion": model}
+            self.send_body(200, json.dumps(body, ensure_ascii=False), 'application/json')
+            return
+
+        # SSE 스트리밍 (chunked 전송으로 keep-alive 유지)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        step = FakeGeminiConfig.chunk_tokens * 2
+        pieces = [text[i:i + step] for i in range(0, len(text), step)]
+        for n, piece in enumerate(pieces):
+            time.sleep(FakeGeminiConfig.chunk_tokens / FakeGeminiConfig.token_rate)
+            chunk = {"candidates": [{"content": {"role": "model", "parts": [{"text": piece}]}, "index": 0}],
+                     "modelVersion": model}
+            if n == len(pieces) - 1:
+                chunk["candidates"][0]["finishReason"] = "STOP"
+                chunk["usageMetadata"] = usage
+            event = f"data: {json.dumps(chunk, ensure_ascii=False)}\r\n\r\n".encode('utf-8')
+            self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class PostgrestStubHandler(QuietHandler):
+    """PostgREST 호환 최소 스텁 (/rest/v1/<table> insert/select)"""
+    tables = {}
+    lock = threading.Lock()
+
+    def table_name(self):
+        match = re.match(r'^/rest/v1/([^?/]+)', self.path)
+        return match.group(1) if match else None
+
+    def do_POST(self):
+        table = self.table_name()
+        payload = self.read_json()
+        rows = payload if isinstance(payload, list) else [payload]
+        with self.lock:
+            stored = self.tables.setdefault(table, [])
+            for row in rows:
+                row = dict(row)
+                row.setdefault('id', f"{len(stored) + 1:08d}-0000-4000-8000-000000000000")
+                row.setdefault('created_at', time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime()))
+                stored.append(row)
+            inserted = stored[-len(rows):]
+        self.send_body(201, json.dumps(inserted, ensure_ascii=False), 'application/json')
+
+    def do_PATCH(self):
+        self.read_json()
+        self.send_body(200, '[]', 'application/json')
+
+    @staticmethod
+    def matches(row, column, condition):
+        """eq./in. 필터 조건 검사 (그 밖의 연산자는 통과)"""
+        operator, _, operand = condition.partition('.')
+        value = '' if row.get(column) is None else str(row.get(column))
+        if operator == 'eq':
+            return value == operand.strip('"')
+        if operator == 'in':
+            return value in [item.strip().strip('"') for item in operand.strip('()').split(',')]
+        return True
+
+    def do_GET(self):
+        query = parse_qsl(urlsplit(self.path).query)
+        filters = [(column, condition) for column, condition in query
+                   if column not in ('select', 'order', 'limit', 'offset', 'or')]
+        with self.lock:
+            rows = [row for row in self.tables.get(self.table_name(), [])
+                    if all(self.matches(row, column, condition) for column, condition in filters)]
+        self.send_body(200, json.dumps(rows, ensure_ascii=False), 'application/json')
+
+
+def run_stage(name, iterations, concurrency, task):
+    """task(i)를 반복 실행하고 (처리량, 지연 시간 목록, 오류 수) 측정"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def timed(i):
+        start = time.perf_counter()
+        try:
+            task(i)
+        except Exception as e:
+            with lock:
+                errors.append(f"{type(e).__name__}: {e}")
+            return
+        with lock:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, range(iterations)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    result = {
+        'stage': name,
+        'iterations': iterations,
+        'errors': len(errors),
+        'throughput_per_s': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': MetricsRecorder.percentile(latencies, 0.5),
+        'p95_ms': MetricsRecorder.percentile(latencies, 0.95),
+        'p99_ms': MetricsRecorder.percentile(latencies, 0.99),
+    }
+    if errors:
+        result['first_error'] = errors[0]
+    return result
+
+
+def run_pool_stage(urls, workers):
+    """크롤링 프로세스 풀로 URL 목록을 한 번에 처리하고 run_stage와 같은 형식으로 측정
+
+    워커 수를 바꿔 가며 실행하면 코어 수에 따른 처리량 확장을 확인할 수 있습니다.
+    """
+    errors = []
+    start = time.perf_counter()
+    with CrawlPool(workers=workers) as pool:
+        for url, content, error in pool.crawl(urls):
+            if not content:
+                errors.append(f"{url}: {error}")
+    elapsed = time.perf_counter() - start
+
+    latencies = metrics.values('crawl_pool', 'task_ms')
+    result = {
+        'stage': f"crawl_pool_{workers}",
+        'iterations': len(urls),
+        'errors': len(errors),
+        'throughput_per_s': (len(urls) - len(errors)) / elapsed if elapsed else 0.0,
+        'p50_ms': MetricsRecorder.percentile(latencies, 0.5),
+        'p95_ms': MetricsRecorder.percentile(latencies, 0.95),
+        'p99_ms': MetricsRecorder.percentile(latencies, 0.99),
+    }
+    if errors:
+        result['first_error'] = errors[0]
+    return result
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """기준선 대비 p95 지연 또는 처리량이 허용치 이상 나빠진 단계 목록 반환"""
+    regressions = []
+    for result in results:
+        base = baseline.get(result['stage'])
+        if not base:
+            continue
+        if base['p95_ms'] and result['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{result['stage']}: p95 {base['p95_ms']:.1f}ms → {result['p95_ms']:.1f}ms")
+        if base['throughput_per_s'] and result['throughput_per_s'] < base['throughput_per_s'] * (1 - tolerance):
+            regressions.append(f"{result['stage']}: 처리량 {base['throughput_per_s']:.2f}/s → "
+                               f"{result['throughput_per_s']:.2f}/s")
+    return regressions
+
+
+def print_report(results):
+    print(f"\n{'단계':<12}{'반복':>6}{'오류':>6}{'처리량/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(f"{r['stage']:<12}{r['iterations']:>6}{r['errors']:>6}{r['throughput_per_s']:>10.2f}"
+              f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}")
+        if 'first_error' in r:
+            print(f"    첫 오류: {r['first_error']}")
+
+    print("\n세부 계측 (blog_generator.metrics)")
+    for row in metrics.summary():
+        name = row['name'] + ''.join(f" ({v})" for v in row['labels'].values())
+        print(f"  {row['stage']}/{name:<24} n={row['count']:<5} p50={row['p50']:.1f} "
+              f"p95={row['p95']:.1f} p99={row['p99']:.1f}")
+    for stage, name, labels, value in metrics.counter_rows():
+        print(f"  {stage}/{name} {labels} = {value}")
+    for pool, rate in connection_reuse_rates().items():
+        print(f"  연결 재사용률 ({pool}): {rate:.1%}")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="브랜드 블로그 파이프라인 벤치마크")
+    parser.add_argument('--stages', default='crawl,analyze,generate,supabase',
+                        help="실행할 단계 (쉼표로 구분)")
+    parser.add_argument('--iterations', type=int, default=10, help="단계별 반복 횟수")
+    parser.add_argument('--concurrency', type=int, default=1, help="동시 실행 수")
+    parser.add_argument('--workers', type=int, default=CRAWL_WORKERS, help="crawl_pool 단계의 워커 프로세스 수")
+    parser.add_argument('--latency', type=float, default=FakeGeminiConfig.latency,
+                        help="가짜 Gemini 첫 토큰 지연 (초)")
+    parser.add_argument('--token-rate', type=float, default=FakeGeminiConfig.token_rate,
+                        help="가짜 Gemini 초당 토큰 수")
+    parser.add_argument('--error-rate', type=float, default=FakeGeminiConfig.error_rate,
+                        help="가짜 Gemini 429 응답 비율 (0~1)")
+    parser.add_argument('--seed', type=int, default=0, help="429 주입용 난수 시드")
+    parser.add_argument('--baseline', help="비교할 기준선 JSON 파일")
+    parser.add_argument('--save-baseline', help="이번 결과를 기준선으로 저장할 JSON 파일")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="회귀 판정 허용 비율")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    stages = [s.strip() for s in args.stages.split(',') if s.strip()]
+    random.seed(args.seed)
+    FakeGeminiConfig.latency = args.latency
+    FakeGeminiConfig.token_rate = args.token_rate
+    FakeGeminiConfig.error_rate = args.error_rate
+
+    QCoreApplication(sys.argv)
+    _, fixture_port = start_server(FixtureHandler)
+    _, gemini_port = start_server(FakeGeminiHandler)
+    _, postgrest_port = start_server(PostgrestStubHandler)
+
+    CrawlThread.launch_args = [
+        f"--host-resolver-rules=MAP blog.naver.com 127.0.0.1:{fixture_port},"
+        f"MAP *.tistory.com 127.0.0.1:{fixture_port},"
+        f"MAP bench.example.com 127.0.0.1:{fixture_port}"
+    ]
+    client = create_genai_client("bench", base_url=f"http://127.0.0.1:{gemini_port}")
+    supabase = create_client(f"http://127.0.0.1:{postgrest_port}", STUB_SUPABASE_KEY)
+
+    reference = read_fixture('reference.txt')
+    analysis = fake_generation('분석해주세요')
+    sites = list(CRAWL_URLS.values())
+
+    tasks = {
+        'crawl': lambda i: run_thread_sync(CrawlThread(sites[i % len(sites)])),
+        # 분석 캐시에 걸리지 않도록 반복마다 레퍼런스를 조금씩 바꿈
+        'analyze': lambda i: run_thread_sync(AnalyzeThread(client, f"{reference}\n(벤치마크 {i})")),
+        'generate': lambda i: run_thread_sync(GenerateThread(
+            client, reference, analysis, "겨울철 손 관리", "핸드크림, 보습, 각질", "")),
+        'supabase': lambda i: insert_project(supabase, {
+            "reference_text": reference, "analysis_result": analysis,
+            "topic": f"벤치마크 주제 {i}", "keywords": "보습", "generated_content": reference,
+            "status": "completed"}),
+    }
+
+    results = []
+    for stage in stages:
+        if stage == 'crawl_pool':
+            print(f"[{stage}] {args.iterations}페이지 실행 중 (워커 {args.workers})...")
+            results.append(run_pool_stage([sites[i % len(sites)] for i in range(args.iterations)], args.workers))
+            continue
+        if stage not in tasks:
+            print(f"알 수 없는 단계: {stage}")
+            return 2
+        print(f"[{stage}] {args.iterations}회 실행 중 (동시 {args.concurrency})...")
+        results.append(run_stage(stage, args.iterations, args.concurrency, tasks[stage]))
+
+    print_report(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({r['stage']: r for r in results}, f, ensure_ascii=False, indent=2)
+        print(f"\n기준선 저장: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\n⚠️ 성능 회귀 감지:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("\n기준선 대비 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
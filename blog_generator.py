@@ -1,256 +1,2563 @@
 import sys
 import os
-import requests
+import re
+import json
+import math
+import copy
+import hashlib
+import difflib
+import gzip
+import xml.etree.ElementTree as ET
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse, unquote
+import time
+import atexit
+import argparse
+import threading
+import multiprocessing
+import multiprocessing.connection
+import logging
+import logging.handlers
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import numpy as np
+import psutil
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import sync_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QTextEdit, QPushButton, QLabel,
                              QLineEdit, QFileDialog, QComboBox, QStatusBar,
-                             QSplitter, QGroupBox, QMessageBox)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+                             QSplitter, QGroupBox, QMessageBox, QDialog,
+                             QTableWidget, QTableWidgetItem, QHeaderView,
+                             QSpinBox, QDateEdit, QInputDialog, QTextBrowser,
+                             QAbstractItemView)
+from PyQt5.QtCore import Qt, QThread, QCoreApplication, QDate, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont, QPalette, QColor
 from google import genai
+from google.genai import types
 from supabase import create_client, Client
 from dotenv import load_dotenv
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+
+# zstd 압축: Python 3.14 표준 라이브러리 또는 zstandard 패키지 (둘 다 없으면 gzip만 지원)
+try:
+    from compression import zstd
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
 
 # 환경 변수 로드
 load_dotenv()
 
 
+# 진단 로그 (오류/경고는 stderr, main()에서 형식 설정)
+logger = logging.getLogger('brandblog')
+LOG_FORMAT = '%(asctime)s %(levelname)s %(processName)s %(name)s: %(message)s'
+
+# 로컬 데이터 저장 위치 (로그, 캐시 등)
+DATA_DIR = os.getenv("BRANDBLOG_DATA_DIR", os.path.join(os.path.expanduser("~"), ".brandblog"))
+METRICS_LOG_PATH = os.path.join(DATA_DIR, "logs", "metrics.jsonl")
+METRICS_LOG_MAX_BYTES = 5 * 1024 * 1024
+METRICS_LOG_BACKUPS = 5
+# 백분위 계산용으로 메모리에 보관할 최근 측정값 개수
+METRICS_WINDOW = 5000
+# 측정값 필드 중 따로 집계해 Prometheus 라벨로 노출할 항목 (값 종류가 적은 것만)
+METRIC_LABELS = ('model',)
+# /metrics 서버 바인드 주소 (기본은 로컬에서만 접근, 외부 수집기가 필요하면 0.0.0.0)
+METRICS_BIND_HOST = os.getenv("BRANDBLOG_METRICS_HOST", "127.0.0.1")
+
+DEFAULT_MODEL = 'gemini-2.5-flash'
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+class MetricsRecorder:
+    """단계별(crawl/analyze/generate/supabase) 계측 기록
+
+    측정값(지연 시간, 바이트, 토큰 수)과 카운터(캐시 적중, 오류 유형)를 메모리에
+    집계하고, 모든 이벤트를 회전 JSONL 로그에 한 줄씩 남깁니다.
+    백분위는 최근 METRICS_WINDOW개 측정값으로 계산하고, 합계/개수는 누적값을 따로 유지합니다.
+    여러 스레드에서 동시에 호출해도 안전합니다.
+    """
+
+    def __init__(self, log_path=METRICS_LOG_PATH):
+        self.log_path = log_path
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.totals = {}
+        self.counters = {}
+        self.logger = None
+
+    def _log(self, event):
+        """이벤트를 JSONL 로그에 기록 (최초 기록 시 로그 파일 준비)"""
+        try:
+            if self.logger is None:
+                os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+                handler = logging.handlers.RotatingFileHandler(
+                    self.log_path, maxBytes=METRICS_LOG_MAX_BYTES,
+                    backupCount=METRICS_LOG_BACKUPS, encoding='utf-8'
+                )
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                logger = logging.getLogger('brandblog.metrics')
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                logger.addHandler(handler)
+                self.logger = logger
+            event['ts'] = time.time()
+            self.logger.info(json.dumps(event, ensure_ascii=False))
+        except OSError as e:
+            logger.warning("메트릭 로그 기록 오류: %s", e)
+
+    def observe(self, stage, name, value, **fields):
+        """측정값 기록 (예: observe('crawl', 'page_load_ms', 812.3), METRIC_LABELS 필드별로 따로 집계)"""
+        labels = tuple((label, str(fields[label])) for label in METRIC_LABELS if fields.get(label))
+        with self.lock:
+            key = (stage, name, labels)
+            if key not in self.samples:
+                self.samples[key] = deque(maxlen=METRICS_WINDOW)
+                self.totals[key] = [0.0, 0]
+            self.samples[key].append(value)
+            self.totals[key][0] += value
+            self.totals[key][1] += 1
+        self._log({'type': 'observe', 'stage': stage, 'name': name, 'value': value, **fields})
+
+    def count(self, stage, name, amount=1, **labels):
+        """카운터 증가 (예: count('analyze', 'cache_hits'))"""
+        with self.lock:
+            key = (stage, name, tuple(sorted(labels.items())))
+            self.counters[key] = self.counters.get(key, 0) + amount
+        self._log({'type': 'count', 'stage': stage, 'name': name, 'amount': amount, **labels})
+
+    def error(self, stage, exc):
+        """오류를 예외 클래스별로 집계"""
+        self.count(stage, 'errors', error_class=type(exc).__name__)
+
+    @contextmanager
+    def timer(self, stage, name, **fields):
+        """with 블록의 소요 시간을 밀리초로 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, name, (time.perf_counter() - start) * 1000, **fields)
+
+    @staticmethod
+    def percentile(sorted_values, q):
+        """정렬된 값 목록에서 백분위수 계산 (nearest-rank)"""
+        if not sorted_values:
+            return 0.0
+        index = max(0, math.ceil(q * len(sorted_values)) - 1)
+        return sorted_values[index]
+
+    def values(self, stage, name):
+        """측정값의 최근 구간 값 목록 (라벨별 계열을 합쳐 정렬, 잠금 상태에서 복사)"""
+        with self.lock:
+            values = [value for (key_stage, key_name, _), samples in self.samples.items()
+                      if (key_stage, key_name) == (stage, name) for value in samples]
+        return sorted(values)
+
+    def summary(self):
+        """측정값별 요약 통계 (최근 구간의 개수, 평균, p50/p95/p99와 누적 합계/개수)"""
+        with self.lock:
+            items = [(key, sorted(values), tuple(self.totals[key])) for key, values in self.samples.items()]
+        rows = []
+        for (stage, name, labels), values, (total_sum, total_count) in sorted(items):
+            rows.append({
+                'stage': stage, 'name': name, 'labels': dict(labels), 'count': len(values),
+                'mean': sum(values) / len(values) if values else 0.0,
+                'p50': self.percentile(values, 0.5),
+                'p95': self.percentile(values, 0.95),
+                'p99': self.percentile(values, 0.99),
+                'total_sum': total_sum, 'total_count': total_count,
+            })
+        return rows
+
+    def counter_rows(self):
+        """카운터 목록 (stage, name, labels, value)"""
+        with self.lock:
+            return [(stage, name, dict(labels), value)
+                    for (stage, name, labels), value in sorted(self.counters.items())]
+
+    @staticmethod
+    def label_text(labels):
+        """Prometheus 라벨 문자열 ({k="v",...}, 값의 \\, ", 줄바꿈은 이스케이프)"""
+        if not labels:
+            return ''
+        escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                   for v in labels.values())
+        return '{' + ','.join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + '}'
+
+    def to_prometheus(self):
+        """Prometheus 텍스트 노출 형식으로 변환"""
+        def metric_name(stage, name):
+            return re.sub(r'[^a-zA-Z0-9_]', '_', f"brandblog_{stage}_{name}")
+
+        lines = []
+        declared = set()
+        for row in self.summary():
+            name = metric_name(row['stage'], row['name'])
+            if name not in declared:
+                lines.append(f"# TYPE {name} summary")
+                declared.add(name)
+            for quantile, key in (('0.5', 'p50'), ('0.95', 'p95'), ('0.99', 'p99')):
+                lines.append(f"{name}{self.label_text({**row['labels'], 'quantile': quantile})} {row[key]:.3f}")
+            # _sum/_count는 rate()/increase()가 동작하도록 누적값으로 노출
+            lines.append(f"{name}_sum{self.label_text(row['labels'])} {row['total_sum']:.3f}")
+            lines.append(f"{name}_count{self.label_text(row['labels'])} {row['total_count']}")
+        for stage, name, labels, value in self.counter_rows():
+            full_name = metric_name(stage, name) + "_total"
+            if full_name not in declared:
+                lines.append(f"# TYPE {full_name} counter")
+                declared.add(full_name)
+            lines.append(f"{full_name}{self.label_text(labels)} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRecorder()
+
+
+def serve_metrics(port, host=METRICS_BIND_HOST):
+    """/metrics 경로로 Prometheus 메트릭을 노출하는 HTTP 서버를 백그라운드로 실행"""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.to_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# 공유 HTTP 전송 계층 (keep-alive HTTP/2 연결 풀)
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE = 10
+HTTP_KEEPALIVE_EXPIRY = 120
+HTTP_TIMEOUT = 15
+WARMUP_ENABLED = os.getenv("BRANDBLOG_WARMUP", "1") != "0"
+
+
+class PooledTransport(httpx.HTTPTransport):
+    """연결을 재사용하는 HTTP/2 전송 계층 (요청 수와 새 연결 수를 계측)
+
+    httpx 전송 계층은 스레드 안전하므로 하나를 여러 워커 스레드가 함께 씁니다.
+    새 연결 수 / 요청 수로 연결 재사용률을 계산할 수 있습니다.
+    """
+
+    def __init__(self, pool):
+        super().__init__(
+            http2=True,
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY)
+        )
+        self.pool = pool
+
+    def handle_request(self, request):
+        metrics.count('http', 'requests', pool=self.pool)
+        request.extensions['trace'] = self.tracer(request.extensions.get('trace'))
+        return super().handle_request(request)
+
+    def tracer(self, inner):
+        """httpcore 추적 이벤트로 새 TCP 연결과 TLS 핸드셰이크 시간 기록"""
+        started = {}
+
+        def trace(event, info):
+            if event == 'connection.connect_tcp.started':
+                metrics.count('http', 'connections', pool=self.pool)
+            elif event == 'connection.start_tls.started':
+                started['tls'] = time.perf_counter()
+            elif event == 'connection.start_tls.complete' and 'tls' in started:
+                metrics.observe('http', 'tls_handshake_ms',
+                                (time.perf_counter() - started.pop('tls')) * 1000, pool=self.pool)
+            if inner:
+                inner(event, info)
+
+        return trace
+
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """정적 HTML 빠른 경로(블로그 수집 등)에서 함께 쓰는 HTTP 클라이언트"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                transport=PooledTransport('web'),
+                headers={'User-Agent': USER_AGENT},
+                timeout=HTTP_TIMEOUT,
+                follow_redirects=True
+            )
+        return _http_client
+
+
+def create_genai_client(api_key, **http_options):
+    """연결 풀을 공유하는 Gemini 클라이언트 생성 (모든 분석/생성 스레드가 함께 사용)"""
+    return genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(client_args={'transport': PooledTransport('gemini')}, **http_options)
+    )
+
+
+def connection_reuse_rates():
+    """풀별 연결 재사용률 (1 - 새 연결 수 / 요청 수)"""
+    totals = {}
+    for stage, name, labels, value in metrics.counter_rows():
+        if stage == 'http' and name in ('requests', 'connections'):
+            totals.setdefault(labels.get('pool'), {'requests': 0, 'connections': 0})[name] += value
+    return {pool: 1 - t['connections'] / t['requests']
+            for pool, t in totals.items() if t['requests']}
+
+
+def warm_up_connections(client, model=DEFAULT_MODEL):
+    """Gemini 연결(DNS, TCP, TLS, HTTP/2)을 백그라운드에서 미리 열어 두기
+
+    BRANDBLOG_WARMUP=0이면 건너뜁니다. 실패해도 첫 실제 호출에서 다시 연결하므로 무시합니다.
+    """
+    if not WARMUP_ENABLED:
+        return None
+
+    def warm_up():
+        try:
+            with metrics.timer('http', 'warmup_ms', pool='gemini'):
+                client.models.get(model=model)
+        except Exception as e:
+            metrics.error('http', e)
+
+    thread = threading.Thread(target=warm_up, daemon=True)
+    thread.start()
+    return thread
+
+
+def generate_text(client, prompt, stage, model=DEFAULT_MODEL, usage_log=None):
+    """Gemini 스트리밍 호출로 텍스트 생성 (지연 시간, TTFT, 토큰 수 기록)
+
+    usage_log 리스트를 넘기면 호출별 사용량을 추가해 둡니다 (generation_metrics 저장용).
+    """
+    start = time.perf_counter()
+    ttft_ms = None
+    chunks = []
+    usage = None
+    try:
+        for chunk in client.models.generate_content_stream(model=model, contents=prompt):
+            if chunk.text:
+                if not chunks:
+                    ttft_ms = (time.perf_counter() - start) * 1000
+                    metrics.observe(stage, 'ttft_ms', ttft_ms, model=model)
+                chunks.append(chunk.text)
+            if chunk.usage_metadata:
+                usage = chunk.usage_metadata
+    except Exception as e:
+        metrics.error(stage, e)
+        raise
+
+    latency_ms = (time.perf_counter() - start) * 1000
+    metrics.observe(stage, 'model_latency_ms', latency_ms, model=model)
+    prompt_tokens = (usage.prompt_token_count or 0) if usage else None
+    output_tokens = (usage.candidates_token_count or 0) if usage else None
+    if usage:
+        metrics.observe(stage, 'prompt_tokens', prompt_tokens, model=model)
+        metrics.observe(stage, 'output_tokens', output_tokens, model=model)
+    if usage_log is not None:
+        usage_log.append({
+            'stage': stage, 'model': model,
+            'latency_ms': round(latency_ms), 'ttft_ms': round(ttft_ms) if ttft_ms is not None else None,
+            'prompt_tokens': prompt_tokens, 'output_tokens': output_tokens,
+        })
+    return ''.join(chunks)
+
+
+# 모델 티어 (저렴/빠름 → 고품질) 와 100만 토큰당 가격 (입력, 출력 USD)
+MODEL_TIERS = ['gemini-2.5-flash-lite', 'gemini-2.5-flash', 'gemini-2.5-pro']
+MODEL_PRICES = {
+    'gemini-2.5-flash-lite': (0.10, 0.40),
+    'gemini-2.5-flash': (0.30, 2.50),
+    'gemini-2.5-pro': (1.25, 10.00),
+}
+# 단계별 정책: 입력 글자 수 상한별 티어, 최저 티어, 지연 SLO(ms)
+# - 짧은 레퍼런스 분석, 섹션 재작성, 캘린더 초안은 저렴한 모델로
+# - 긴 레퍼런스는 품질을 위해 상위 모델로
+STAGE_POLICIES = {
+    'analyze': {'size_tiers': [(6000, 0), (30000, 1), (None, 2)], 'floor': 0, 'slo_ms': 30000},
+    'analyze_merge': {'size_tiers': [(None, 1)], 'floor': 1, 'slo_ms': 45000},
+    'generate': {'size_tiers': [(20000, 1), (None, 2)], 'floor': 1, 'slo_ms': 90000},
+    'generate_batch': {'size_tiers': [(8000, 0), (None, 1)], 'floor': 0, 'slo_ms': 60000},
+    'generate_section': {'size_tiers': [(None, 0)], 'floor': 0, 'slo_ms': 20000},
+}
+ROUTER_LATENCY_WINDOW = 50
+# 이보다 오래된 지연 측정값은 무시 (SLO로 낮춘 티어도 시간이 지나면 다시 시도)
+ROUTER_LATENCY_TTL = 10 * 60
+MODEL_SPEND_PATH = os.path.join(DATA_DIR, "model_spend.json")
+# 비용 파일은 호출마다 쓰지 않고 이 간격(초)마다, 그리고 종료 시 저장
+MODEL_SPEND_FLUSH_INTERVAL = 30
+
+
+def is_quota_error(exc):
+    """할당량 초과(429 / RESOURCE_EXHAUSTED) 오류인지"""
+    return getattr(exc, 'code', None) == 429 or 'RESOURCE_EXHAUSTED' in str(exc)
+
+
+def estimate_cost(model, prompt_tokens, output_tokens):
+    """토큰 수로 호출 비용(USD) 추정"""
+    input_price, output_price = MODEL_PRICES.get(model, MODEL_PRICES[DEFAULT_MODEL])
+    return ((prompt_tokens or 0) * input_price + (output_tokens or 0) * output_price) / 1_000_000
+
+
+class ModelRouter:
+    """단계별 정책에 따라 입력 크기, 지연 SLO, 일일 예산으로 모델을 고르는 라우터
+
+    - BRANDBLOG_MODEL_<STAGE> (예: BRANDBLOG_MODEL_GENERATE=gemini-2.5-pro): 단계 모델 고정
+    - BRANDBLOG_SLO_MS_<STAGE>: 단계 지연 SLO 변경
+    - BRANDBLOG_DAILY_BUDGET_USD: 하루 추정 비용이 넘으면 단계 최저 티어만 사용
+      (할당량 오류 시에도 그보다 상위 티어로는 대체하지 않음)
+    SLO 판단에는 최근 ROUTER_LATENCY_TTL초 안의 측정값만 쓰므로, 지연 때문에 트래픽이 끊긴
+    티어도 측정값이 만료되면 다시 선택됩니다.
+    할당량 오류가 나면 다른 티어 모델로 다시 시도하고, 선택 사유는 사용량 기록에 남깁니다.
+    """
+
+    def __init__(self, policies=STAGE_POLICIES, spend_path=MODEL_SPEND_PATH):
+        self.policies = policies
+        self.spend_path = spend_path
+        self.budget_usd = float(os.getenv("BRANDBLOG_DAILY_BUDGET_USD", "0") or 0)
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.spend = None
+        self.spend_dirty = False
+        self.spend_saved_at = time.monotonic()
+
+    def policy(self, stage):
+        policy = dict(self.policies.get(stage, {'size_tiers': [(None, MODEL_TIERS.index(DEFAULT_MODEL))],
+                                                'floor': 0, 'slo_ms': 60000}))
+        policy['slo_ms'] = int(os.getenv(f"BRANDBLOG_SLO_MS_{stage.upper()}", policy['slo_ms']))
+        return policy
+
+    def p95_latency(self, stage, model):
+        """최근 ROUTER_LATENCY_TTL초 안의 지연 p95 (측정값이 없으면 None)"""
+        cutoff = time.monotonic() - ROUTER_LATENCY_TTL
+        with self.lock:
+            window = self.latencies.get((stage, model))
+            while window and window[0][0] < cutoff:
+                window.popleft()
+            values = sorted(latency for _, latency in window or [])
+        return MetricsRecorder.percentile(values, 0.95) if values else None
+
+    def spent_today(self):
+        """오늘 추정 비용 (로컬 파일에 누적)"""
+        with self.lock:
+            if self.spend is None:
+                try:
+                    with open(self.spend_path, 'r', encoding='utf-8') as f:
+                        self.spend = json.load(f)
+                except (OSError, ValueError):
+                    self.spend = {}
+            return self.spend.get(datetime.now().strftime('%Y-%m-%d'), 0.0)
+
+    def add_spend(self, cost):
+        """오늘 비용에 더하고, 마지막 저장 후 MODEL_SPEND_FLUSH_INTERVAL초가 지났으면 파일에 저장"""
+        self.spent_today()
+        today = datetime.now().strftime('%Y-%m-%d')
+        with self.lock:
+            self.spend[today] = self.spend.get(today, 0.0) + cost
+            self.spend_dirty = True
+            due = time.monotonic() - self.spend_saved_at >= MODEL_SPEND_FLUSH_INTERVAL
+        if due:
+            self.flush_spend()
+
+    def flush_spend(self):
+        """저장하지 않은 비용 기록을 파일에 저장 (종료 시에도 호출)"""
+        with self.lock:
+            if not self.spend_dirty:
+                return
+            # 최근 30일만 보관
+            self.spend = dict(sorted(self.spend.items())[-30:])
+            self.spend_dirty = False
+            self.spend_saved_at = time.monotonic()
+            try:
+                os.makedirs(os.path.dirname(self.spend_path), exist_ok=True)
+                with open(self.spend_path + '.tmp', 'w', encoding='utf-8') as f:
+                    json.dump(self.spend, f)
+                os.replace(self.spend_path + '.tmp', self.spend_path)
+            except OSError as e:
+                self.spend_dirty = True
+                metrics.error('router', e)
+                logger.warning("모델 비용 기록 오류: %s", e)
+
+    def route(self, stage, size):
+        """입력 크기(글자 수)로 단계 모델 선택, (모델, 사유) 반환"""
+        pinned = os.getenv(f"BRANDBLOG_MODEL_{stage.upper()}")
+        if pinned:
+            return pinned, 'pinned'
+
+        policy = self.policy(stage)
+        tier = next(t for limit, t in policy['size_tiers'] if limit is None or size <= limit)
+        reason = f"size:{size}"
+
+        if self.budget_usd and self.spent_today() >= self.budget_usd:
+            return MODEL_TIERS[policy['floor']], 'budget'
+
+        # 최근 p95 지연이 SLO를 넘으면 최저 티어까지 한 단계씩 낮춤
+        while tier > policy['floor']:
+            p95 = self.p95_latency(stage, MODEL_TIERS[tier])
+            if p95 is None or p95 <= policy['slo_ms']:
+                break
+            tier -= 1
+            reason = f"slo:{round(p95)}ms"
+        return MODEL_TIERS[tier], reason
+
+    def fallback_chain(self, model, over_budget=False):
+        """할당량 오류 시 시도할 순서 (선택 모델 → 하위 티어 → 상위 티어, 예산 초과 시 상위 티어 제외)"""
+        if model not in MODEL_TIERS:
+            return [model] + MODEL_TIERS[::-1]
+        index = MODEL_TIERS.index(model)
+        higher = [] if over_budget else MODEL_TIERS[index + 1:]
+        return [model] + MODEL_TIERS[:index][::-1] + higher
+
+    def generate(self, client, prompt, stage, usage_log=None, size=None, route=None):
+        """라우팅된 모델로 generate_text 호출 (할당량 오류 시 다음 모델로 대체)"""
+        model, reason = route or self.route(stage, len(prompt) if size is None else size)
+        chain = self.fallback_chain(model, over_budget=bool(self.budget_usd) and
+                                    self.spent_today() >= self.budget_usd)
+        for attempt, candidate in enumerate(chain):
+            calls = []
+            try:
+                text = generate_text(client, prompt, stage, model=candidate, usage_log=calls)
+            except Exception as e:
+                if not is_quota_error(e) or attempt == len(chain) - 1:
+                    raise
+                metrics.count('router', 'fallbacks', from_model=candidate, to_model=chain[attempt + 1])
+                continue
+
+            usage = calls[0]
+            cost = estimate_cost(candidate, usage['prompt_tokens'], usage['output_tokens'])
+            with self.lock:
+                window = self.latencies.setdefault((stage, candidate), deque(maxlen=ROUTER_LATENCY_WINDOW))
+                window.append((time.monotonic(), usage['latency_ms']))
+            self.add_spend(cost)
+            metrics.count('router', 'routes', stage=stage, model=candidate)
+            metrics.observe(stage, 'cost_usd', cost, model=candidate)
+            if usage_log is not None:
+                usage_log.append({**usage, 'route_reason': reason, 'cost_usd': round(cost, 6),
+                                  'fallback_from': model if candidate != model else None})
+            return text
+
+
+model_router = ModelRouter()
+atexit.register(model_router.flush_spend)
+
+
+# 초안 검증 기준 (레퍼런스 대비 허용 배율)
+SECTION_LENGTH_TOLERANCE = (0.5, 1.5)
+TOTAL_LENGTH_TOLERANCE = (0.7, 1.3)
+# 검증 실패 섹션 재생성 최대 반복 횟수
+MAX_SECTION_FIX_ROUNDS = 2
+
+# 항상 소제목으로 인식할 줄 패턴 (마크다운, 소제목 기호, 【】)
+HEADING_PATTERN = re.compile(
+    r'^(#{1,6}\s+\S.*'
+    r'|[■□◆◇📌]\s*\S.{0,40}'
+    r'|【[^】]{1,40}】.{0,20})$'
+)
+# 번호/원문자 줄: 앞뒤 줄이 목록 항목이 아닐 때만 소제목 (본문 안 번호 목록은 섹션을 나누지 않음)
+NUMBERED_HEADING_PATTERN = re.compile(r'^(\d{1,2}[\.\)]|[①-⑳])\s*\S.{0,40}$')
+LIST_ITEM_PATTERN = re.compile(r'^(\d{1,2}[\.\)]|[①-⑳]|[-*•·●✔✅▶▷])\s*\S')
+
+
+def parse_keywords(keywords):
+    """쉼표로 구분된 키워드 문자열을 리스트로 변환"""
+    return [k.strip() for k in keywords.split(',') if k.strip()]
+
+
+def split_title(text):
+    """글을 (제목, 나머지 본문)으로 분리"""
+    lines = text.strip().splitlines()
+    if not lines:
+        return "", ""
+    return lines[0].strip(), '\n'.join(lines[1:]).strip('\n')
+
+
+def is_heading(lines, index):
+    """lines[index]가 소제목인지 (번호 줄은 바로 앞뒤 줄이 목록 항목이 아니고 뒤에 본문이 있어야 함)"""
+    line = lines[index].strip()
+    if HEADING_PATTERN.match(line):
+        return True
+    if not NUMBERED_HEADING_PATTERN.match(line) or index + 1 >= len(lines):
+        return False
+    prev_line = lines[index - 1].strip() if index > 0 else ''
+    return not LIST_ITEM_PATTERN.match(prev_line) and not LIST_ITEM_PATTERN.match(lines[index + 1].strip())
+
+
+def split_sections(body):
+    """본문을 섹션 목록으로 분리 (첫 소제목 이전 내용은 heading이 None인 서론 섹션)"""
+    sections = []
+    heading, lines = None, []
+    body_lines = body.splitlines()
+    for index, line in enumerate(body_lines):
+        if is_heading(body_lines, index):
+            if heading is not None or any(l.strip() for l in lines):
+                sections.append({'heading': heading, 'body': '\n'.join(lines).strip('\n')})
+            heading, lines = line.strip(), []
+        else:
+            lines.append(line)
+    sections.append({'heading': heading, 'body': '\n'.join(lines).strip('\n')})
+    return sections
+
+
+def join_sections(title, sections):
+    """제목과 섹션 목록을 다시 하나의 글로 합침"""
+    blocks = [title] if title else []
+    for section in sections:
+        if section['heading'] is not None:
+            blocks.append(f"{section['heading']}\n{section['body']}".strip('\n'))
+        elif section['body'].strip():
+            blocks.append(section['body'].strip('\n'))
+    return '\n\n'.join(blocks)
+
+
+def extract_structure_metrics(text):
+    """글의 구조 지표 추출 (섹션 수, 전체/섹션별 길이, 문단 수)"""
+    _, body = split_title(text)
+    sections = split_sections(body)
+    section_lengths = [len(s['body']) for s in sections if s['heading'] is not None]
+    return {
+        'total_length': len(body),
+        'section_count': len(section_lengths),
+        'section_lengths': section_lengths,
+        'paragraph_count': len([p for p in re.split(r'\n\s*\n', body) if p.strip()]),
+    }
+
+
+def contains_keyword(text, keyword):
+    """공백/대소문자를 무시하고 키워드 포함 여부 확인"""
+    return re.sub(r'\s+', '', keyword).lower() in re.sub(r'\s+', '', text).lower()
+
+
+def validate_draft(draft, reference_metrics, keywords):
+    """초안을 레퍼런스 구조 지표와 키워드 목록에 대해 검증
+
+    각 문제는 dict로 반환되며, 'section'이 정수이면 해당 섹션만 재생성해서
+    고칠 수 있는 문제, None이면 글 전체에 대한 문제(보고만 함)입니다.
+    """
+    issues = []
+    _, body = split_title(draft)
+    sections = split_sections(body)
+    headed = [i for i, s in enumerate(sections) if s['heading'] is not None]
+    ref_lengths = reference_metrics['section_lengths']
+
+    # 섹션 수
+    if reference_metrics['section_count'] and len(headed) != reference_metrics['section_count']:
+        issues.append({
+            'check': 'section_count', 'section': None,
+            'message': f"섹션 수 불일치: {len(headed)}개 (레퍼런스 {reference_metrics['section_count']}개)"
+        })
+
+    # 섹션별 길이
+    if ref_lengths:
+        low = min(ref_lengths) * SECTION_LENGTH_TOLERANCE[0]
+        high = max(ref_lengths) * SECTION_LENGTH_TOLERANCE[1]
+        target = sorted(ref_lengths)[len(ref_lengths) // 2]
+        for i in headed:
+            length = len(sections[i]['body'])
+            if not low <= length <= high:
+                issues.append({
+                    'check': 'section_length', 'section': i, 'target_length': target,
+                    'message': f"섹션 '{sections[i]['heading']}' 길이 {length}자 (허용 {int(low)}~{int(high)}자)"
+                })
+
+    # 전체 길이 (가장 짧은/긴 섹션 하나만 고쳐서 맞춤)
+    total = len(body)
+    ref_total = reference_metrics['total_length']
+    low, high = ref_total * TOTAL_LENGTH_TOLERANCE[0], ref_total * TOTAL_LENGTH_TOLERANCE[1]
+    if ref_total and not low <= total <= high:
+        candidates = headed or list(range(len(sections)))
+        pick = min if total < low else max
+        index = pick(candidates, key=lambda i: len(sections[i]['body']))
+        diff = (low - total) if total < low else (high - total)
+        issues.append({
+            'check': 'total_length', 'section': index,
+            'target_length': max(100, len(sections[index]['body']) + int(diff)),
+            'message': f"전체 길이 {total}자 (허용 {int(low)}~{int(high)}자)"
+        })
+
+    # 키워드 포함 (빠진 키워드는 본문 섹션에 순서대로 배정)
+    missing = [k for k in keywords if not contains_keyword(draft, k)]
+    targets = headed or [0]
+    for n, keyword in enumerate(missing):
+        issues.append({
+            'check': 'keyword', 'section': targets[n % len(targets)], 'keyword': keyword,
+            'message': f"키워드 누락: {keyword}"
+        })
+
+    return issues
+
+
+# 여러 레퍼런스를 한 입력창에 넣을 때 쓰는 구분선
+REFERENCE_SEPARATOR = "===== 레퍼런스 구분 ====="
+ANALYSIS_CACHE_DIR = os.path.join(DATA_DIR, "analysis_cache")
+# 동시에 분석할 최대 레퍼런스 수
+MAX_PARALLEL_ANALYSES = 10
+
+
+def split_references(text):
+    """구분선으로 나뉜 레퍼런스 목록 반환 (빈 항목 제외)"""
+    parts = re.split(rf'^\s*{re.escape(REFERENCE_SEPARATOR)}\s*$', text, flags=re.MULTILINE)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def join_references(references):
+    """레퍼런스 목록을 구분선으로 이어 붙임"""
+    return f"\n\n{REFERENCE_SEPARATOR}\n\n".join(r.strip() for r in references if r.strip())
+
+
+def blend_structure_metrics(texts):
+    """여러 레퍼런스의 구조 지표를 하나로 합침 (평균, 섹션 길이는 전체 범위 유지)"""
+    per_reference = [extract_structure_metrics(text) for text in texts]
+    if len(per_reference) == 1:
+        return per_reference[0]
+    n = len(per_reference)
+    return {
+        'total_length': round(sum(m['total_length'] for m in per_reference) / n),
+        'section_count': round(sum(m['section_count'] for m in per_reference) / n),
+        'section_lengths': [length for m in per_reference for length in m['section_lengths']],
+        'paragraph_count': round(sum(m['paragraph_count'] for m in per_reference) / n),
+    }
+
+
+def content_hash(text):
+    """텍스트 내용 해시 (SHA-256, 중복 제거/캐시 키)"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """레퍼런스 내용 해시별 분석 결과 로컬 캐시 (같은 레퍼런스는 한 번만 분석)
+
+    키는 레퍼런스 내용만 사용하므로 라우팅 결과나 대체 모델과 관계없이 재사용됩니다.
+    """
+
+    def __init__(self, cache_dir=ANALYSIS_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def path(self, reference_text):
+        return os.path.join(self.cache_dir, f"{content_hash(reference_text)}.txt")
+
+    def get(self, reference_text):
+        try:
+            with open(self.path(reference_text), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, reference_text, analysis_result):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self.path(reference_text)
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                f.write(analysis_result)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            metrics.error('analyze', e)
+            logger.warning("분석 캐시 저장 오류: %s", e)
+
+
+analysis_cache = AnalysisCache()
+
+
+def build_analysis_prompt(reference_text):
+    """레퍼런스 구조 분석 프롬프트"""
+    return f"""다음 블로그 글을 분석하여 구조와 특징을 추출해주세요.
+
+레퍼런스 글:
+{reference_text}
+
+다음 항목들을 분석해주세요:
+1. 제목 패턴 및 스타일
+2. 서론 구성 방식 (문제 제기, 공감, 호기심 유발 등)
+3. 본론 섹션 개수와 각 섹션의 구조
+4. 소제목 스타일과 패턴
+5. 문단 길이와 구성 방식
+6. 결론 방식 (요약, CTA, 질문 등)
+7. 특징적인 문체 요소 (문장 길이, 어조, 키워드 사용 등)
+8. 전체적인 글의 톤 앤 매너
+
+각 항목에 대해 구체적으로 분석하고, 이 스타일을 재현하기 위한 핵심 요소를 정리해주세요."""
+
+
+def analyze_reference_text(client, reference_text, usage_log=None):
+    """레퍼런스 하나를 분석 (캐시에 있으면 재사용, 모델은 레퍼런스 길이로 선택)"""
+    cached = analysis_cache.get(reference_text)
+    if cached is not None:
+        metrics.count('analyze', 'cache_hits')
+        return cached
+    metrics.count('analyze', 'cache_misses')
+    analysis_result = model_router.generate(client, build_analysis_prompt(reference_text), 'analyze',
+                                            usage_log=usage_log, size=len(reference_text))
+    metrics.observe('analyze', 'reference_bytes', len(reference_text.encode('utf-8')))
+    analysis_cache.put(reference_text, analysis_result)
+    return analysis_result
+
+
+def get_or_create(supabase, table, match, row):
+    """match 조건의 행 ID를 찾고, 없을 때만 큰 본문(row)을 보내 추가"""
+    query = supabase.table(table).select("id")
+    for column, value in match.items():
+        query = query.eq(column, value)
+    response = query.limit(1).execute()
+    if response.data:
+        metrics.count('supabase', 'dedup_hits', table=table)
+        return response.data[0]['id']
+    with metrics.timer('supabase', 'insert_ms', table=table):
+        response = supabase.table(table).upsert({**match, **row}, on_conflict=','.join(match)).execute()
+    return response.data[0]['id']
+
+
+def normalize_project_refs(supabase, data, model=DEFAULT_MODEL):
+    """레퍼런스/분석 본문을 정규화 테이블로 옮기고 blog_projects에 넣을 참조 컬럼 반환"""
+    columns = {}
+    reference = data.get('reference_text')
+    if reference:
+        reference_id = get_or_create(
+            supabase, "blog_references",
+            {"content_hash": content_hash(reference)},
+            {"reference_text": reference, "reference_url": data.get('reference_url')}
+        )
+        columns.update(reference_id=reference_id, reference_text=None)
+
+        analysis = data.get('analysis_result')
+        if analysis:
+            columns['analysis_id'] = get_or_create(
+                supabase, "blog_analyses",
+                {"reference_id": reference_id, "analysis_hash": content_hash(analysis)},
+                {"analysis_result": analysis, "model": model}
+            )
+            columns['analysis_result'] = None
+    return columns
+
+
+def save_project_keywords(supabase, project_id, keywords):
+    """키워드를 keywords/project_keywords 테이블에 정규화해서 저장"""
+    labels = {}
+    for keyword in keywords:
+        labels.setdefault(normalize_keyword(keyword), keyword)
+    if not labels:
+        return
+    # 이미 있는 키워드는 그대로 두고(처음 저장된 표기 유지) 새 키워드만 추가한 뒤 ID 조회
+    supabase.table("keywords").upsert(
+        [{"keyword": key, "label": label} for key, label in labels.items()],
+        on_conflict="keyword", ignore_duplicates=True
+    ).execute()
+    response = supabase.table("keywords")\
+        .select("id, keyword")\
+        .in_("keyword", list(labels))\
+        .execute()
+    ids = {row['keyword']: row['id'] for row in response.data}
+    positions = {key: i for i, key in enumerate(labels)}
+    supabase.table("project_keywords").upsert(
+        [{"project_id": project_id, "keyword_id": ids[key], "position": positions[key]}
+         for key in labels if key in ids],
+        on_conflict="project_id,keyword_id"
+    ).execute()
+
+
+def save_generation_metrics(supabase, project_id, usage_log):
+    """모델 호출별 지연 시간/토큰/모델을 generation_metrics에 저장"""
+    if usage_log:
+        supabase.table("generation_metrics").insert(
+            [{"project_id": project_id, **usage} for usage in usage_log]
+        ).execute()
+
+
+def analysis_model_of(usage_log):
+    """분석 결과를 만든 모델 (레퍼런스 여러 개를 합친 프로필이면 analyze_merge 모델)"""
+    models = {}
+    for usage in usage_log or []:
+        models.setdefault(usage['stage'], usage['model'])
+    return models.get('analyze_merge') or models.get('analyze') or DEFAULT_MODEL
+
+
+def insert_project(supabase, data, usage_log=None):
+    """blog_projects에 행을 추가하고 새 프로젝트 행 반환 (소요 시간 기록)
+
+    레퍼런스/분석 본문은 내용 해시로 중복 제거된 blog_references/blog_analyses에 한 번만
+    저장하고, 키워드와 생성 지표는 각각의 정규화 테이블에 함께 기록합니다.
+    """
+    data = dict(data)
+    analysis_model = analysis_model_of(usage_log)
+    try:
+        data.update(normalize_project_refs(supabase, data, model=analysis_model))
+    except Exception as e:
+        # 정규화 스키마(supabase_migration_normalize.sql) 적용 전이면 기존 방식으로 저장
+        metrics.error('supabase', e)
+        logger.warning("정규화 저장 실패, 본문을 blog_projects에 그대로 저장합니다: %s", e)
+
+    try:
+        with metrics.timer('supabase', 'insert_ms', table='blog_projects'):
+            response = supabase.table("blog_projects").insert(data).execute()
+    except Exception as e:
+        metrics.error('supabase', e)
+        raise
+    metrics.observe('supabase', 'insert_bytes', len(json.dumps(data, ensure_ascii=False).encode('utf-8')))
+    row = response.data[0] if response.data else None
+
+    if row:
+        try:
+            save_project_keywords(supabase, row['id'], parse_keywords(data.get('keywords') or ''))
+            save_generation_metrics(supabase, row['id'], usage_log)
+        except Exception as e:
+            metrics.error('supabase', e)
+            logger.error("키워드/생성 지표 저장 오류: %s", e)
+    return row
+
+
+def update_project(supabase, project_id, data, updated_at, usage_log=None):
+    """기존 blog_projects 행을 새 내용으로 갱신 (같은 프로젝트의 재생성)
+
+    마지막으로 받은 updated_at과 같을 때만 갱신하고, 다른 곳에서 먼저 수정됐으면
+    아무것도 바꾸지 않고 None을 반환합니다.
+    """
+    data = dict(data)
+    analysis_model = analysis_model_of(usage_log)
+    try:
+        data.update(normalize_project_refs(supabase, data, model=analysis_model))
+    except Exception as e:
+        metrics.error('supabase', e)
+        logger.warning("정규화 저장 실패, 본문을 blog_projects에 그대로 저장합니다: %s", e)
+
+    with metrics.timer('supabase', 'update_ms', table='blog_projects'):
+        response = supabase.table("blog_projects")\
+            .update({**data, "updated_at": datetime.now(timezone.utc).isoformat()})\
+            .eq("id", project_id)\
+            .eq("updated_at", updated_at)\
+            .execute()
+    if not response.data:
+        metrics.count('supabase', 'update_conflicts', table='blog_projects')
+        return None
+    try:
+        supabase.table("project_keywords").delete().eq("project_id", project_id).execute()
+        save_project_keywords(supabase, project_id, parse_keywords(data.get('keywords') or ''))
+        save_generation_metrics(supabase, project_id, usage_log)
+    except Exception as e:
+        metrics.error('supabase', e)
+        logger.error("키워드/생성 지표 저장 오류: %s", e)
+    return response.data[0]
+
+
+# 버전 기록: 첫 버전은 전체 본문, 이후는 줄 단위 변경분(delta)으로 저장
+# REVISION_SNAPSHOT_INTERVAL 버전마다 전체 본문을 다시 저장해 복원 시 적용할 변경분 수를 제한
+REVISION_SNAPSHOT_INTERVAL = 10
+
+
+def make_delta(base, new):
+    """base → new 줄 단위 변경분 ([시작, 끝] = base 줄 복사, 문자열 = 새 줄)"""
+    base_lines = base.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    delta = []
+    matcher = difflib.SequenceMatcher(None, base_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            delta.append([i1, i2])
+        elif j2 > j1:
+            delta.append(''.join(new_lines[j1:j2]))
+    return delta
+
+
+def apply_delta(base, delta):
+    """make_delta로 만든 변경분을 base에 적용"""
+    base_lines = base.splitlines(keepends=True)
+    return ''.join(op if isinstance(op, str) else ''.join(base_lines[op[0]:op[1]]) for op in delta)
+
+
+class RevisionStore:
+    """blog_revisions 테이블에 프로젝트별 생성/수정 버전 기록
+
+    프로젝트마다 마지막 버전 본문을 기억해 두고 새 버전과의 변경분만 저장합니다.
+    변경분이 전체 본문보다 크거나 마지막 전체 본문 이후 REVISION_SNAPSHOT_INTERVAL 버전이
+    지나면 전체 본문을 저장하므로, 어떤 버전이든 최대 그 수만큼의 변경분만 적용해서 복원됩니다.
+    """
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+        self.lock = threading.Lock()
+        self.heads = {}
+
+    def list(self, project_id):
+        """버전 목록 (본문 제외, 최신순)"""
+        response = self.supabase.table("blog_revisions")\
+            .select("revision, created_at, source, kind, length")\
+            .eq("project_id", project_id)\
+            .order("revision", desc=True)\
+            .execute()
+        return response.data
+
+    def get(self, project_id, revision):
+        """버전 하나의 본문 복원, (본문, 그 사이 마지막 전체 본문 버전 번호) 반환"""
+        with metrics.timer('revisions', 'reconstruct_ms'):
+            response = self.supabase.table("blog_revisions")\
+                .select("revision, kind, content, delta")\
+                .eq("project_id", project_id)\
+                .lte("revision", revision)\
+                .gt("revision", revision - REVISION_SNAPSHOT_INTERVAL)\
+                .order("revision")\
+                .execute()
+        rows = response.data
+        start = max(i for i, row in enumerate(rows) if row['kind'] == 'full')
+        content = rows[start]['content']
+        for row in rows[start + 1:]:
+            content = apply_delta(content, row['delta'])
+        metrics.observe('revisions', 'deltas_applied', len(rows) - start - 1)
+        return content, rows[start]['revision']
+
+    def head(self, project_id):
+        """마지막 버전 정보 (없으면 None)"""
+        if project_id not in self.heads:
+            response = self.supabase.table("blog_revisions")\
+                .select("revision, content_hash")\
+                .eq("project_id", project_id)\
+                .order("revision", desc=True)\
+                .limit(1)\
+                .execute()
+            if not response.data:
+                return None
+            revision = response.data[0]['revision']
+            content, last_full = self.get(project_id, revision)
+            self.heads[project_id] = {'revision': revision, 'content': content, 'last_full': last_full,
+                                      'hash': response.data[0]['content_hash']}
+        return self.heads[project_id]
+
+    def append(self, project_id, content, source):
+        """새 버전 추가 (마지막 버전과 같으면 건너뜀), 버전 번호 반환"""
+        with self.lock:
+            for attempt in range(2):
+                try:
+                    return self._append(project_id, content, source)
+                except Exception as e:
+                    # 다른 곳에서 먼저 버전이 추가됐으면(번호 충돌) 최신 상태를 다시 읽고 한 번 더 시도
+                    self.heads.pop(project_id, None)
+                    if attempt:
+                        metrics.error('revisions', e)
+                        raise
+
+    def _append(self, project_id, content, source):
+        head = self.head(project_id)
+        digest = content_hash(content)
+        if head and head['hash'] == digest:
+            return head['revision']
+
+        revision = head['revision'] + 1 if head else 1
+        row = {"project_id": project_id, "revision": revision, "source": source,
+               "content_hash": digest, "length": len(content)}
+        delta = make_delta(head['content'], content) if head else None
+        if head and revision - head['last_full'] < REVISION_SNAPSHOT_INTERVAL and \
+                len(json.dumps(delta, ensure_ascii=False)) < len(content):
+            row.update(kind="delta", delta=delta)
+            last_full = head['last_full']
+        else:
+            row.update(kind="full", content=content)
+            last_full = revision
+
+        with metrics.timer('revisions', 'insert_ms', kind=row['kind']):
+            self.supabase.table("blog_revisions").insert(row).execute()
+        metrics.observe('revisions', 'stored_bytes', len(json.dumps(row, ensure_ascii=False).encode('utf-8')),
+                        kind=row['kind'])
+        self.heads[project_id] = {'revision': revision, 'content': content, 'last_full': last_full, 'hash': digest}
+        return revision
+
+
+# 대량 내보내기/가져오기 (압축 JSONL)
+EXPORT_PAGE_SIZE = 500
+IMPORT_CHUNK_SIZE = 500
+# 가져올 때 쓰는 컬럼 (참조 ID는 다른 Supabase 프로젝트에 없으므로 제외)
+IMPORT_COLUMNS = ['id', 'created_at', 'updated_at', 'reference_url', 'reference_text',
+                  'analysis_result', 'topic', 'keywords', 'requirements', 'generated_content',
+                  'status', 'tags']
+
+
+def open_jsonl(path, mode):
+    """확장자(.gz, .zst)에 맞게 압축 JSONL 파일을 텍스트 모드로 열기"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    if path.endswith('.zst'):
+        if zstd is None:
+            raise RuntimeError("zstd 압축을 쓰려면 Python 3.14 이상 또는 zstandard 패키지가 필요합니다.")
+        return zstd.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def export_projects(supabase, path, progress=print):
+    """blog_projects를 서버 측 키셋 페이징으로 읽어 압축 JSONL로 스트리밍 저장
+
+    한 번에 한 페이지만 메모리에 두므로 행 수와 관계없이 메모리 사용량이 일정합니다.
+    정규화 스키마(supabase_migration_normalize.sql) 적용 전이라 blog_projects_full 뷰가
+    없으면 blog_projects에서 그대로 읽습니다.
+    """
+    start = time.perf_counter()
+    rows = 0
+    cursor = None
+    table = "blog_projects_full"
+    with open_jsonl(path, 'w') as f:
+        while True:
+            query = supabase.table(table)\
+                .select("*")\
+                .order("created_at")\
+                .order("id")\
+                .limit(EXPORT_PAGE_SIZE)
+            if cursor:
+                created_at, last_id = cursor
+                query = query.or_(f'created_at.gt."{created_at}",'
+                                  f'and(created_at.eq."{created_at}",id.gt.{last_id})')
+            try:
+                with metrics.timer('export', 'page_ms'):
+                    page = query.execute().data
+            except Exception as e:
+                if cursor or table == "blog_projects":
+                    raise
+                metrics.error('export', e)
+                logger.warning("blog_projects_full 뷰를 읽을 수 없어 blog_projects에서 내보냅니다: %s", e)
+                table = "blog_projects"
+                continue
+            for row in page:
+                f.write(json.dumps(row, ensure_ascii=False) + '\n')
+            rows += len(page)
+            if page:
+                cursor = (page[-1]['created_at'], page[-1]['id'])
+                progress(f"내보내는 중... {rows}행")
+            if len(page) < EXPORT_PAGE_SIZE:
+                break
+
+    elapsed = time.perf_counter() - start
+    rate = rows / elapsed if elapsed else 0.0
+    metrics.observe('export', 'rows_per_s', rate)
+    return {'rows': rows, 'seconds': elapsed, 'rows_per_s': rate, 'bytes': os.path.getsize(path)}
+
+
+def import_projects(supabase, path, progress=print):
+    """압축 JSONL을 한 줄씩 읽어 청크 단위로 blog_projects에 upsert (id 기준)
+
+    가져온 행은 본문이 blog_projects에 그대로 들어가므로, 가져온 뒤
+    supabase_migration_normalize.sql을 다시 실행하면 정규화 테이블로 옮겨집니다.
+    """
+    start = time.perf_counter()
+    rows = 0
+    chunk = []
+
+    def flush():
+        with metrics.timer('import', 'chunk_ms', size=len(chunk)):
+            supabase.table("blog_projects").upsert(chunk, on_conflict="id").execute()
+        chunk.clear()
+
+    with open_jsonl(path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            chunk.append({column: row[column] for column in IMPORT_COLUMNS if column in row})
+            rows += 1
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                flush()
+                progress(f"가져오는 중... {rows}행")
+        if chunk:
+            flush()
+
+    elapsed = time.perf_counter() - start
+    rate = rows / elapsed if elapsed else 0.0
+    metrics.observe('import', 'rows_per_s', rate)
+    return {'rows': rows, 'seconds': elapsed, 'rows_per_s': rate}
+
+
+# 작성 중인 내용 자동 저장 (로컬 추가 전용 저널)
+DRAFTS_DIR = os.path.join(DATA_DIR, "drafts")
+AUTOSAVE_DELAY_MS = 1500
+DRAFT_SYNC_DELAY_MS = 10000
+JOURNAL_COMPACT_BYTES = 512 * 1024
+DRAFT_BACKUPS = 10
+# 자동 저장 대상 필드 (위젯 내용 + 프로젝트 정보)
+DRAFT_META_FIELDS = ['project_id', 'style_profile_id', 'project_updated_at']
+DRAFT_FIELDS = ['url', 'reference_text', 'analysis_result', 'topic', 'keywords',
+                'requirements', 'generated_content'] + DRAFT_META_FIELDS
+# blog_projects에 동기화하는 필드 (레퍼런스/분석은 정규화 테이블에 공유되므로 제외)
+DRAFT_SYNC_FIELDS = ['topic', 'keywords', 'requirements', 'generated_content']
+
+
+def splice_diff(old, new):
+    """두 문자열의 공통 앞/뒤를 제외한 변경 구간 (start, end, text) 계산
+
+    old[start:end]를 text로 바꾸면 new가 됩니다. 타이핑처럼 한곳만 바뀌는 편집은
+    바뀐 글자만 기록하므로 문서 크기와 관계없이 저널 기록이 작습니다.
+    """
+    def common_length(a, b, suffix=False):
+        # 슬라이스 비교(C 구현)로 이분 탐색해서 큰 문서도 빠르게 비교
+        low, high = 0, min(len(a), len(b))
+        while low < high:
+            mid = (low + high + 1) // 2
+            if (a[len(a) - mid:] == b[len(b) - mid:]) if suffix else (a[:mid] == b[:mid]):
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
+    start = common_length(old, new)
+    tail = common_length(old[start:], new[start:], suffix=True)
+    return start, len(old) - tail, new[start:len(new) - tail]
+
+
+class DraftJournal:
+    """작성 중인 필드를 스냅샷 + 변경 구간 저널로 저장
+
+    변경마다 snapshot.json을 다시 쓰지 않고 journal.jsonl에 변경 구간만 한 줄씩 추가하고,
+    저널이 커지면 스냅샷을 원자적으로 다시 쓴 뒤 저널을 비웁니다(압축).
+    각 항목에 순번(seq)을 붙여 압축 도중 종료돼도 복원 시 중복 적용하지 않습니다.
+    """
+
+    def __init__(self, directory=DRAFTS_DIR):
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, "snapshot.json")
+        self.journal_path = os.path.join(directory, "journal.jsonl")
+        self.state = {}
+        self.seq = 0
+
+    def load(self):
+        """스냅샷에 저널을 적용해 마지막 상태 복원"""
+        self.state, self.seq = {}, 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self.state, self.seq = snapshot['state'], snapshot['seq']
+        torn = False
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 기록 도중 종료된 마지막 줄은 버림
+                        torn = True
+                        break
+                    if entry['seq'] <= self.seq:
+                        continue
+                    old = self.state.get(entry['field'], '')
+                    self.state[entry['field']] = old[:entry['start']] + entry['text'] + old[entry['end']:]
+                    self.seq = entry['seq']
+        if torn:
+            # 잘린 줄 뒤에 이어 쓰지 않도록 바로 압축
+            self.compact()
+        return dict(self.state)
+
+    def record(self, state):
+        """이전 상태와 달라진 필드의 변경 구간을 저널에 추가하고 변경된 필드 목록 반환
+
+        기록(fsync)이 끝난 뒤에만 state/seq를 바꾸므로, 쓰기에 실패하면 상태가 그대로 남아
+        다음 호출에서 같은 변경을 다시 기록합니다. 일부만 쓰인 줄은 잘라냅니다.
+        """
+        entries = []
+        seq = self.seq
+        for field in DRAFT_FIELDS:
+            old, new = self.state.get(field, ''), state.get(field, '')
+            if old == new:
+                continue
+            start, end, text = splice_diff(old, new)
+            seq += 1
+            entries.append({'seq': seq, 'field': field, 'start': start, 'end': end, 'text': text})
+        if not entries:
+            return []
+
+        os.makedirs(self.directory, exist_ok=True)
+        with metrics.timer('autosave', 'journal_write_ms', entries=len(entries)):
+            data = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries).encode('utf-8')
+            # 버퍼를 거치지 않고 써야 실패했을 때 남은 버퍼가 나중에 다시 쓰이지 않음
+            fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                position = os.lseek(fd, 0, os.SEEK_END)
+                try:
+                    written = 0
+                    while written < len(data):
+                        written += os.write(fd, data[written:])
+                    os.fsync(fd)
+                except OSError:
+                    os.ftruncate(fd, position)
+                    raise
+            finally:
+                os.close(fd)
+        for entry in entries:
+            self.state[entry['field']] = state.get(entry['field'], '')
+        self.seq = seq
+        if os.path.getsize(self.journal_path) > JOURNAL_COMPACT_BYTES:
+            self.compact()
+        return [entry['field'] for entry in entries]
+
+    def compact(self):
+        """현재 상태를 스냅샷으로 원자적으로 쓰고 저널 비우기"""
+        os.makedirs(self.directory, exist_ok=True)
+        with metrics.timer('autosave', 'compact_ms'):
+            tmp_path = self.snapshot_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'seq': self.seq, 'state': self.state}, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            open(self.journal_path, 'w').close()
+
+    def has_content(self):
+        """복원할 만한 내용이 있는지 (프로젝트 정보 필드 제외)"""
+        return any(self.state.get(field) for field in DRAFT_FIELDS if field not in DRAFT_META_FIELDS)
+
+    def backup(self):
+        """현재 상태를 backup-<시각>.json으로 보관 (최근 DRAFT_BACKUPS개만 유지)"""
+        if not self.has_content():
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"backup-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        backups = sorted(name for name in os.listdir(self.directory) if name.startswith('backup-'))
+        for name in backups[:-DRAFT_BACKUPS]:
+            os.remove(os.path.join(self.directory, name))
+        return path
+
+    def clear(self):
+        """저장된 상태 비우기 (빈 스냅샷으로 압축)"""
+        self.state = {}
+        self.compact()
+
+
+# 콘텐츠 캘린더: 시드 키워드 확장 템플릿 (검색 의도 수식어, 제목 템플릿)
+TOPIC_TEMPLATES = [
+    ("효과", "{kw}, 제대로 알고 쓰면 효과가 달라집니다"),
+    ("추천", "{kw} 추천 BEST 5 | {kw2}까지 한 번에 정리"),
+    ("방법", "{kw} 방법, 초보자도 쉽게 따라하기"),
+    ("고르는법", "실패 없는 {kw} 고르는 법"),
+    ("실수", "{kw}에서 흔히 하는 실수 5가지"),
+    ("비교", "{kw} vs {kw2}, 무엇이 다를까?"),
+    ("후기", "{kw} 한 달 후기와 솔직한 변화"),
+    ("주의사항", "{kw} 전에 꼭 알아야 할 주의사항"),
+    ("FAQ", "{kw} 자주 묻는 질문 총정리"),
+    ("루틴", "{kw2}와 함께하는 {kw} 루틴"),
+]
+# 검색 의도 템플릿을 다 쓰면 시드 앞에 붙여 롱테일 키워드를 만드는 대상/상황 수식어
+LONG_TAIL_QUALIFIERS = ["초보", "직장인", "겨울철", "여름철", "가성비", "민감한", "20대", "40대"]
+# 키워드 집합 Jaccard 유사도가 이 값 이상이면 기존 글과 키워드가 겹치는 것으로 판단
+PLAN_OVERLAP_THRESHOLD = 0.6
+KEYWORD_INDEX_PATH = os.path.join(DATA_DIR, "keyword_index.json")
+HISTORY_PAGE_SIZE = 1000
+# 일괄 생성 동시 실행 수
+BATCH_MAX_WORKERS = 3
+
+
+def normalize_keyword(keyword):
+    """비교용 키워드 정규화 (공백 제거, 소문자)"""
+    return re.sub(r'\s+', '', keyword).lower()
+
+
+class KeywordIndex:
+    """키워드 → 프로젝트 역색인 (주제 중복/키워드 잠식 검사용)
+
+    blog_projects 히스토리를 한 번 색인해 로컬 파일에 저장해 두고,
+    이후에는 마지막 (created_at, id) 이후의 행만 받아 증분 갱신합니다.
+    """
+
+    def __init__(self):
+        self.docs = {}
+        self.postings = {}
+        self.last_created_at = None
+        self.last_id = None
+
+    def add(self, doc_id, topic, keywords):
+        """문서(기존 글 또는 계획된 글) 추가"""
+        keyword_set = {normalize_keyword(k) for k in keywords if k.strip()}
+        self.docs[doc_id] = {'topic': normalize_keyword(topic or ''), 'keywords': keyword_set}
+        for keyword in keyword_set:
+            self.postings.setdefault(keyword, set()).add(doc_id)
+
+    def find_overlap(self, query_key, keywords, threshold=PLAN_OVERLAP_THRESHOLD):
+        """겹치는 문서 ID 반환 (없으면 None)
+
+        같은 키워드를 가진 문서만 역색인으로 골라서, 대상 검색어(query_key)가
+        주제나 키워드에 이미 들어 있거나 키워드 집합이 threshold 이상 겹치면 중복으로 봅니다.
+        """
+        keyword_set = {normalize_keyword(k) for k in keywords if k.strip()}
+        candidates = set()
+        for keyword in keyword_set:
+            candidates |= self.postings.get(keyword, set())
+        for doc_id in candidates:
+            doc = self.docs[doc_id]
+            if query_key in doc['topic'] or query_key in doc['keywords']:
+                return doc_id
+            union = keyword_set | doc['keywords']
+            if union and len(keyword_set & doc['keywords']) / len(union) >= threshold:
+                return doc_id
+        return None
+
+    def refresh(self, supabase):
+        """Supabase에서 마지막 색인 이후 추가된 프로젝트만 가져와 색인 (키셋 페이징)"""
+        while True:
+            query = supabase.table("blog_projects")\
+                .select("id, topic, keywords, created_at")\
+                .order("created_at")\
+                .order("id")\
+                .limit(HISTORY_PAGE_SIZE)
+            # created_at이 같은 행이 페이지 경계에 걸려도 빠지지 않도록 (created_at, id) 키셋 사용
+            if self.last_created_at and self.last_id:
+                query = query.or_(f'created_at.gt."{self.last_created_at}",'
+                                  f'and(created_at.eq."{self.last_created_at}",id.gt.{self.last_id})')
+            elif self.last_created_at:
+                # id 없이 저장된 예전 색인 파일: 같은 시각의 행부터 다시 받음 (같은 ID는 덮어씀)
+                query = query.gte("created_at", self.last_created_at)
+            with metrics.timer('plan', 'history_page_ms'):
+                rows = query.execute().data
+            for row in rows:
+                self.add(row['id'], row['topic'], parse_keywords(row.get('keywords') or ''))
+            if rows:
+                self.last_created_at = rows[-1]['created_at']
+                self.last_id = rows[-1]['id']
+            if len(rows) < HISTORY_PAGE_SIZE:
+                break
+
+    def save(self, path=KEYWORD_INDEX_PATH):
+        """색인을 로컬 파일로 저장"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = {
+            'last_created_at': self.last_created_at,
+            'last_id': self.last_id,
+            'docs': {doc_id: [doc['topic'], sorted(doc['keywords'])] for doc_id, doc in self.docs.items()},
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=KEYWORD_INDEX_PATH):
+        """로컬 파일에서 색인 불러오기 (없거나 손상되면 빈 색인)"""
+        index = cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        index.last_created_at = data.get('last_created_at')
+        index.last_id = data.get('last_id')
+        for doc_id, (topic, keywords) in data.get('docs', {}).items():
+            index.docs[doc_id] = {'topic': topic, 'keywords': set(keywords)}
+            for keyword in keywords:
+                index.postings.setdefault(keyword, set()).add(doc_id)
+        return index
+
+
+class ContentPlanner:
+    """시드 키워드로 주제/키워드 배정을 만들고 기존 글과의 키워드 잠식을 피하는 플래너"""
+
+    def __init__(self, history_index, threshold=PLAN_OVERLAP_THRESHOLD):
+        self.history_index = history_index
+        self.threshold = threshold
+
+    def expand(self, seeds):
+        """시드 키워드 × 템플릿 조합으로 후보 생성 (시드별로 번갈아 가며 나열)
+
+        시드 자체의 템플릿 조합을 먼저 나열하고, 이어서 LONG_TAIL_QUALIFIERS를 붙인
+        롱테일 변형(예: "겨울철 보습")의 조합을 나열하므로 시드당 최대
+        템플릿 수 × (수식어 수 + 1)개까지 배정할 수 있습니다.
+        """
+        ordered = []
+        for qualifier in [None] + LONG_TAIL_QUALIFIERS:
+            per_seed = []
+            for i, seed in enumerate(seeds):
+                others = seeds[i + 1:] + seeds[:i]
+                variant = f"{qualifier} {seed}" if qualifier else seed
+                candidates = []
+                for j, (modifier, template) in enumerate(TOPIC_TEMPLATES):
+                    secondary = others[j % len(others)] if others else ""
+                    if '{kw2}' in template and not secondary:
+                        continue
+                    candidates.append({
+                        'topic': template.format(kw=variant, kw2=secondary),
+                        'query': f"{variant} {modifier}",
+                        'keywords': [k for k in (variant, f"{variant} {modifier}", secondary) if k],
+                    })
+                per_seed.append(candidates)
+            # 라운드 로빈으로 섞어 같은 시드가 연달아 배정되지 않게 함
+            for n in range(max((len(c) for c in per_seed), default=0)):
+                ordered.extend(c[n] for c in per_seed if n < len(c))
+        return ordered
+
+    def plan(self, seeds, count, start_date, posts_per_day=1):
+        """중복을 제거한 주제/키워드 배정과 발행일 목록 반환"""
+        planned_index = KeywordIndex()
+        plan = []
+        skipped = 0
+        for candidate in self.expand(seeds):
+            if len(plan) >= count:
+                break
+            query_key = normalize_keyword(candidate['query'])
+            if self.history_index.find_overlap(query_key, candidate['keywords'], self.threshold) or \
+                    planned_index.find_overlap(query_key, candidate['keywords'], self.threshold):
+                skipped += 1
+                continue
+            planned_index.add(len(plan), candidate['topic'] + candidate['query'], candidate['keywords'])
+            plan.append({
+                'date': (start_date + timedelta(days=len(plan) // max(1, posts_per_day))).isoformat(),
+                'topic': candidate['topic'],
+                'keywords': ', '.join(candidate['keywords']),
+            })
+        metrics.count('plan', 'skipped_overlaps', skipped)
+        return plan
+
+
+# 블로그 전체 수집 (레퍼런스 코퍼스)
+CORPUS_DIR = os.path.join(DATA_DIR, "corpus")
+INGEST_MAX_WORKERS = 8
+INGEST_TIMEOUT = 15
+NAVER_LIST_PAGE_SIZE = 30
+# 수집에 실패한 글을 다음 실행에서 다시 시도하는 최대 횟수 (넘으면 글이 수정될 때까지 건너뜀)
+INGEST_MAX_ATTEMPTS = 3
+
+# 레퍼런스 의미 검색 (임베딩 + 디스크 기반 벡터 색인)
+EMBEDDING_MODEL = 'gemini-embedding-001'
+EMBED_BATCH_SIZE = 100
+# 임베딩에 사용할 본문 최대 길이 (앞부분이 글의 주제를 가장 잘 나타냄)
+EMBED_MAX_CHARS = 6000
+RETRIEVAL_TOP_K = 5
+
+
+class ReferenceCorpus:
+    """수집한 레퍼런스 글을 보관하는 로컬 코퍼스
+
+    manifest.json에 URL별 메타데이터(제목, 수정 시각, 내용 해시)와 블로그 피드 상태
+    (ETag/Last-Modified), 수집에 실패한 글 목록(시도 횟수)을 기록하고,
+    본문은 docs/ 아래 파일로 저장합니다.
+    """
+
+    def __init__(self, corpus_dir=CORPUS_DIR):
+        self.corpus_dir = corpus_dir
+        self.docs_dir = os.path.join(corpus_dir, "docs")
+        self.manifest_path = os.path.join(corpus_dir, "manifest.json")
+        self.lock = threading.Lock()
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+        self.manifest.setdefault('documents', {})
+        self.manifest.setdefault('feeds', {})
+        self.manifest.setdefault('failures', {})
+
+    @property
+    def documents(self):
+        return self.manifest['documents']
+
+    @property
+    def failures(self):
+        return self.manifest['failures']
+
+    def record_failure(self, blog, post, error):
+        """수집 실패 기록 (같은 수정 시각으로 다시 실패하면 시도 횟수 증가), 시도 횟수 반환"""
+        with self.lock:
+            previous = self.failures.get(post['url'], {})
+            same_post = previous.get('post', {}).get('last_modified') == post['last_modified']
+            attempts = (previous.get('attempts', 0) if same_post else 0) + 1
+            self.failures[post['url']] = {
+                'blog': blog,
+                'post': post,
+                'attempts': attempts,
+                'error': str(error)[:200],
+                'failed_at': datetime.now(timezone.utc).isoformat(),
+            }
+        return attempts
+
+    def retry_posts(self, blog):
+        """다시 시도할 실패한 글 목록 (시도 횟수가 INGEST_MAX_ATTEMPTS 미만인 글)"""
+        with self.lock:
+            return [failure['post'] for failure in self.failures.values()
+                    if failure['blog'] == blog and failure['attempts'] < INGEST_MAX_ATTEMPTS]
+
+    def is_given_up(self, url, last_modified):
+        """같은 수정 시각으로 INGEST_MAX_ATTEMPTS번 실패해 건너뛰는 글인지 확인"""
+        failure = self.failures.get(url)
+        return failure is not None and failure['attempts'] >= INGEST_MAX_ATTEMPTS and \
+            failure['post'].get('last_modified') == last_modified
+
+    def is_fresh(self, url, last_modified):
+        """이미 같은 수정 시각으로 수집된 글인지 확인"""
+        doc = self.documents.get(url)
+        return doc is not None and doc.get('last_modified') == last_modified
+
+    def add(self, url, text, title="", last_modified=None, source="crawl"):
+        """글 추가 (같은 URL이면 덮어씀), 문서 ID 반환"""
+        doc_id = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        os.makedirs(self.docs_dir, exist_ok=True)
+        path = os.path.join(self.docs_dir, f"{doc_id}.txt")
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(path + '.tmp', path)
+        with self.lock:
+            self.documents[url] = {
+                'id': doc_id,
+                'title': title,
+                'last_modified': last_modified,
+                'hash': content_hash(text),
+                'source': source,
+                'ingested_at': datetime.now(timezone.utc).isoformat(),
+            }
+            self.failures.pop(url, None)
+        return doc_id
+
+    def read(self, url):
+        """저장된 본문 읽기"""
+        doc = self.documents.get(url)
+        if not doc:
+            return None
+        with open(os.path.join(self.docs_dir, f"{doc['id']}.txt"), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def build_index(self, client, index=None):
+        """색인에 없거나 내용이 바뀐 문서만 배치로 임베딩해 색인에 추가"""
+        index = index or VectorIndex(os.path.join(self.corpus_dir, "index"))
+        pending = [(url, doc['hash']) for url, doc in list(self.documents.items())
+                   if index.indexed_hash(url) != doc['hash']]
+        if pending:
+            texts = [f"{self.documents[url].get('title', '')}\n{self.read(url)}" for url, _ in pending]
+            index.add(pending, embed_texts(client, texts, 'RETRIEVAL_DOCUMENT'))
+            metrics.count('retrieve', 'embedded_documents', len(pending))
+        return index
+
+    def search(self, client, topic, keywords, k=RETRIEVAL_TOP_K, index=None):
+        """주제/키워드에 가장 잘 맞는 레퍼런스 상위 k개 [(URL, 제목, 점수)] 반환"""
+        index = self.build_index(client, index)
+        query = f"{topic}\n{', '.join(keywords)}"
+        query_vector = embed_texts(client, [query], 'RETRIEVAL_QUERY')[0]
+        with metrics.timer('retrieve', 'search_ms', size=len(index)):
+            hits = index.search(query_vector, k)
+        return [(url, self.documents[url].get('title', ''), score) for url, score in hits if url in self.documents]
+
+    def save(self):
+        """manifest 저장 (원자적 교체)"""
+        os.makedirs(self.corpus_dir, exist_ok=True)
+        with self.lock:
+            data = json.dumps(self.manifest, ensure_ascii=False)
+        with open(self.manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(self.manifest_path + '.tmp', self.manifest_path)
+
+
+def parse_blog_target(target):
+    """블로그 ID/주소를 ('naver', 블로그 ID) 또는 ('tistory', 도메인)으로 해석"""
+    target = target.strip().rstrip('/')
+    if '://' not in target and '.' not in target:
+        return 'naver', target
+    parsed = urlparse(target if '://' in target else f"https://{target}")
+    host = parsed.netloc.lower()
+    if host.endswith('blog.naver.com'):
+        query_match = re.search(r'blogId=([\w-]+)', parsed.query)
+        if query_match:
+            return 'naver', query_match.group(1)
+        return 'naver', parsed.path.strip('/').split('/')[0]
+    return 'tistory', host
+
+
+def parse_rss_items(xml_text):
+    """RSS 항목 목록 [{'url', 'title', 'last_modified'}] 반환"""
+    items = []
+    for item in ET.fromstring(xml_text).iter('item'):
+        link = (item.findtext('link') or '').strip()
+        if not link:
+            continue
+        pub_date = (item.findtext('pubDate') or '').strip()
+        try:
+            last_modified = parsedate_to_datetime(pub_date).isoformat() if pub_date else None
+        except (TypeError, ValueError):
+            last_modified = pub_date or None
+        items.append({'url': link, 'title': (item.findtext('title') or '').strip(),
+                      'last_modified': last_modified})
+    return items
+
+
+def embed_texts(client, texts, task_type):
+    """텍스트 목록을 배치 단위로 임베딩해 정규화된 float32 행렬로 반환"""
+    vectors = []
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        batch = [t[:EMBED_MAX_CHARS] for t in texts[start:start + EMBED_BATCH_SIZE]]
+        with metrics.timer('retrieve', 'embed_batch_ms', size=len(batch)):
+            result = client.models.embed_content(
+                model=EMBEDDING_MODEL,
+                contents=batch,
+                config=types.EmbedContentConfig(task_type=task_type)
+            )
+        vectors.extend(e.values for e in result.embeddings)
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class VectorIndex:
+    """NumPy 기반 flat 벡터 색인 (정규화 벡터 내적 = 코사인 유사도)
+
+    vectors.npy는 메모리 맵으로 열어 필요한 부분만 디스크에서 읽고,
+    keys.json에는 행 순서대로 [URL, 내용 해시]를 기록합니다.
+    """
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        self.vectors_path = os.path.join(index_dir, "vectors.npy")
+        self.keys_path = os.path.join(index_dir, "keys.json")
+        self.keys = []
+        self.vectors = None
+        try:
+            with open(self.keys_path, 'r', encoding='utf-8') as f:
+                self.keys = json.load(f)
+            self.vectors = np.load(self.vectors_path, mmap_mode='r')
+        except (OSError, ValueError):
+            self.keys, self.vectors = [], None
+        if self.vectors is not None and len(self.vectors) != len(self.keys):
+            self.keys, self.vectors = [], None
+        # URL별 가장 최근 행 (내용이 바뀌어 다시 임베딩한 글은 옛 행을 무시)
+        self.latest = {url: (row, doc_hash) for row, (url, doc_hash) in enumerate(self.keys)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def indexed_hash(self, url):
+        entry = self.latest.get(url)
+        return entry[1] if entry else None
+
+    def add(self, keys, vectors):
+        """행 추가 후 디스크에 원자적으로 저장"""
+        if not keys:
+            return
+        os.makedirs(self.index_dir, exist_ok=True)
+        combined = vectors if self.vectors is None else np.concatenate([np.asarray(self.vectors), vectors])
+        tmp_path = self.vectors_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, combined.astype(np.float32))
+        os.replace(tmp_path, self.vectors_path)
+        self.keys = self.keys + [list(k) for k in keys]
+        with open(self.keys_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.keys, f, ensure_ascii=False)
+        os.replace(self.keys_path + '.tmp', self.keys_path)
+        self.vectors = np.load(self.vectors_path, mmap_mode='r')
+        self.latest = {url: (row, doc_hash) for row, (url, doc_hash) in enumerate(self.keys)}
+
+    def search(self, query_vector, k=RETRIEVAL_TOP_K):
+        """코사인 유사도 상위 k개 [(URL, 점수)] 반환"""
+        if self.vectors is None or not self.latest:
+            return []
+        rows = np.fromiter((row for row, _ in self.latest.values()), dtype=np.int64)
+        scores = np.asarray(self.vectors[rows] @ query_vector, dtype=np.float32)
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.keys[rows[i]][0], float(scores[i])) for i in top]
+
+
+class BlogIngestThread(QThread):
+    """네이버/티스토리 블로그 전체를 증분 수집해 레퍼런스 코퍼스에 저장하는 스레드
+
+    가벼운 RSS/글 목록 엔드포인트로 글 목록을 받아(RSS는 ETag/Last-Modified 조건부 요청),
+    코퍼스에 같은 수정 시각으로 이미 있는 글은 건너뛰고 새 글만 동시에 가져옵니다.
+    실패한 글은 manifest의 실패 목록에 남겨 피드가 바뀌지 않아도 다음 실행에서
+    INGEST_MAX_ATTEMPTS번까지 다시 시도하고, RSS 검증값과 전체 수집 완료 표시는
+    실행이 끝날 때 manifest에 반영하므로 중단된 실행은 다음에 목록부터 다시 확인합니다.
+    """
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+    progress = pyqtSignal(str)
+
+    def __init__(self, target, corpus=None, max_workers=INGEST_MAX_WORKERS):
+        super().__init__()
+        self.target = target
+        self.corpus = corpus or ReferenceCorpus()
+        self.max_workers = max_workers
+        self.http = get_http_client()
+        # 이번 실행에서 받은 피드 상태 (실행이 끝난 뒤에 manifest에 반영)
+        self.feed_updates = {}
+        self.blog_key = None
+
+    def run(self):
+        try:
+            kind, blog = parse_blog_target(self.target)
+            self.blog_key = f"{kind}:{blog}"
+            with metrics.timer('ingest', 'enumerate_ms', site=kind):
+                posts = self.enumerate_naver(blog) if kind == 'naver' else self.enumerate_rss(blog)
+
+            new_posts = [p for p in posts if not self.corpus.is_fresh(p['url'], p['last_modified'])
+                         and not self.corpus.is_given_up(p['url'], p['last_modified'])]
+            skipped = len(posts) - len(new_posts)
+            # 피드에 다시 나오지 않는(304, RSS 범위 밖) 이전 실패 글도 이어서 시도
+            listed_urls = {p['url'] for p in new_posts}
+            retries = [p for p in self.corpus.retry_posts(self.blog_key) if p['url'] not in listed_urls]
+            new_posts.extend(retries)
+            metrics.count('ingest', 'skipped_posts', skipped)
+            metrics.count('ingest', 'retried_posts', len(retries))
+            self.progress.emit(f"글 {len(posts)}개 확인, 새 글 {len(new_posts) - len(retries)}개"
+                               f"{f' + 재시도 {len(retries)}개' if retries else ''} 수집 중...")
+
+            fetched, failed = self.fetch_posts(kind, new_posts)
+            if failed:
+                logger.warning("수집 실패 %d건: 실패 목록에 기록해 다음 실행에서 재시도합니다.", failed)
+            with self.corpus.lock:
+                self.corpus.manifest['feeds'].update(self.feed_updates)
+            self.corpus.save()
+            extractor_stats.save()
+            self.finished.emit({'blog': blog, 'listed': len(posts), 'skipped': skipped,
+                                'fetched': fetched, 'failed': failed})
+        except Exception as e:
+            metrics.error('ingest', e)
+            self.error.emit(f"블로그 수집 오류: {str(e)}")
+
+    def fetch_feed(self, feed_url):
+        """조건부 GET으로 RSS 요청 (변경 없으면 None)"""
+        state = self.corpus.manifest['feeds'].get(feed_url, {})
+        headers = {}
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+        response = self.http.get(feed_url, headers=headers, timeout=INGEST_TIMEOUT)
+        if response.status_code == 304:
+            metrics.count('ingest', 'feed_not_modified')
+            return None
+        response.raise_for_status()
+        self.feed_updates[feed_url] = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'full_scan_done': state.get('full_scan_done', False),
+        }
+        return response.text
+
+    def enumerate_rss(self, domain):
+        """티스토리 등 RSS 제공 블로그의 글 목록 (처음에는 사이트맵으로 전체 글 확인)"""
+        feed_url = f"https://{domain}/rss"
+        xml_text = self.fetch_feed(feed_url)
+        if xml_text is None:
+            return []
+
+        feed_state = self.feed_updates[feed_url]
+        posts = {item['url']: item for item in parse_rss_items(xml_text)}
+        # RSS에는 최근 글만 있으므로, 전체 수집 후 RSS에 이미 수집한 글이 있을 때만 RSS로 충분
+        overlaps = any(url in self.corpus.documents for url in posts)
+        if feed_state.get('full_scan_done') and (overlaps or not posts):
+            return list(posts.values())
+
+        for item in self.enumerate_sitemap(f"https://{domain}/sitemap.xml"):
+            posts.setdefault(item['url'], item)
+        feed_state['full_scan_done'] = True
+        return list(posts.values())
+
+    def enumerate_sitemap(self, sitemap_url):
+        """사이트맵의 글 주소 목록 (/123, /entry/... 경로만, 사이트맵 색인은 하위 사이트맵까지)"""
+        with metrics.timer('ingest', 'sitemap_ms'):
+            response = self.http.get(sitemap_url, timeout=INGEST_TIMEOUT)
+        if response.status_code == 404:
+            logger.info("사이트맵이 없어 RSS에 있는 최근 글만 수집합니다: %s", sitemap_url)
+            return []
+        response.raise_for_status()
+
+        root = ET.fromstring(response.content)
+        items = []
+        for entry in root:
+            loc = next((child.text or '' for child in entry if child.tag.endswith('loc')), '').strip()
+            if not loc:
+                continue
+            if root.tag.endswith('sitemapindex'):
+                items.extend(self.enumerate_sitemap(loc))
+            elif re.match(r'^/(\d+|entry/.+)$', urlparse(loc).path):
+                lastmod = next((child.text for child in entry if child.tag.endswith('lastmod')), None)
+                items.append({'url': loc, 'title': '',
+                              'last_modified': self.corpus.documents.get(loc, {}).get('last_modified')
+                              or lastmod})
+        return items
+
+    def enumerate_naver(self, blog_id):
+        """네이버 블로그 글 목록 (RSS로 변경 확인 후, 필요할 때만 글 목록 API 페이징)"""
+        feed_url = f"https://rss.blog.naver.com/{blog_id}.xml"
+        xml_text = self.fetch_feed(feed_url)
+        if xml_text is None:
+            return []
+
+        feed_state = self.feed_updates[feed_url]
+        posts = {}
+        for item in parse_rss_items(xml_text):
+            match = re.search(r'/(\d{6,})', item['url'])
+            if match:
+                url = f"https://blog.naver.com/{blog_id}/{match.group(1)}"
+                posts[url] = {**item, 'url': url, 'log_no': match.group(1)}
+
+        # 전체 수집이 끝난 블로그는 RSS에 이미 수집한 글이 하나라도 있으면
+        # 그 사이의 새 글이 모두 RSS 안에 있으므로 글 목록 API를 볼 필요 없음
+        overlaps = any(url in self.corpus.documents for url in posts)
+        if feed_state.get('full_scan_done') and (overlaps or not posts):
+            return list(posts.values())
+
+        page = 1
+        while True:
+            with metrics.timer('ingest', 'list_page_ms', site='naver'):
+                response = self.http.get(
+                    "https://blog.naver.com/PostTitleListAsync.naver",
+                    params={'blogId': blog_id, 'currentPage': page, 'countPerPage': NAVER_LIST_PAGE_SIZE,
+                            'categoryNo': 0, 'parentCategoryNo': 0, 'viewdate': ''},
+                    timeout=INGEST_TIMEOUT
+                )
+            response.raise_for_status()
+            # 네이버 응답에는 JSON에서 허용되지 않는 \' 이스케이프가 섞여 있음
+            data = json.loads(response.text.replace("\\'", "'"))
+            page_posts = data.get('postList') or []
+            page_known = True
+            for post in page_posts:
+                url = f"https://blog.naver.com/{blog_id}/{post['logNo']}"
+                if url not in posts:
+                    posts[url] = {'url': url, 'log_no': post['logNo'],
+                                  'title': unquote(post.get('title', '')).replace('+', ' '),
+                                  'last_modified': self.corpus.documents.get(url, {}).get('last_modified')
+                                  or post.get('addDate')}
+                page_known = page_known and url in self.corpus.documents
+            total = int(data.get('totalCount') or 0)
+            if not page_posts or page * NAVER_LIST_PAGE_SIZE >= total or \
+                    (feed_state.get('full_scan_done') and page_known):
+                break
+            page += 1
+
+        feed_state['full_scan_done'] = True
+        return list(posts.values())
+
+    def fetch_post(self, kind, post):
+        """글 하나를 가져와 본문 추출 (정적 HTML + BeautifulSoup 빠른 경로)"""
+        if kind == 'naver':
+            blog_id = post['url'].split('/')[-2]
+            fetch_url = f"https://blog.naver.com/PostView.naver?blogId={blog_id}&logNo={post['log_no']}"
+        else:
+            fetch_url = post['url']
+        with metrics.timer('ingest', 'fetch_ms', site=kind):
+            response = self.http.get(fetch_url, timeout=INGEST_TIMEOUT)
+        response.raise_for_status()
+        metrics.observe('ingest', 'page_bytes', len(response.content))
+
+        soup = BeautifulSoup(response.text, 'html.parser')
+        extractor = extractor_for_url(str(response.url))
+        content = extract_soup(soup, extractor)
+        if not content and extractor is not GENERAL_EXTRACTOR:
+            content = extract_soup(soup, GENERAL_EXTRACTOR)
+        if not content:
+            raise ContentNotFoundError(f"본문을 찾을 수 없습니다 ({tried_selectors(extractor)})")
+        self.corpus.add(post['url'], content, post.get('title', ''), post['last_modified'], source=f"ingest:{kind}")
+
+    def fetch_posts(self, kind, posts):
+        """새 글들을 동시에 가져오고 (성공 수, 실패 수) 반환
+
+        정적 HTML에서 본문을 찾지 못한 글(스크립트로 그리는 페이지 등)은 모아서
+        크롤링 프로세스 풀로 다시 가져옵니다.
+        """
+        fetched = failed = 0
+        browser_posts = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.fetch_post, kind, post): post for post in posts}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    fetched += 1
+                except ContentNotFoundError:
+                    browser_posts.append(futures[future])
+                except Exception as e:
+                    failed += 1
+                    metrics.error('ingest', e)
+                    attempts = self.corpus.record_failure(self.blog_key, futures[future], e)
+                    logger.error("글 수집 오류 (%s, %d회째): %s", futures[future]['url'], attempts, e)
+                done = fetched + failed + len(browser_posts)
+                if done % 10 == 0 or done == len(posts):
+                    self.progress.emit(f"블로그 수집 중... {done}/{len(posts)}")
+                    # 중간 저장 (중단돼도 다음 실행에서 이어서 수집)
+                    self.corpus.save()
+
+        if browser_posts:
+            metrics.count('ingest', 'browser_fallbacks', len(browser_posts))
+            self.progress.emit(f"브라우저로 다시 수집 중... ({len(browser_posts)}개)")
+            by_url = {post['url']: post for post in browser_posts}
+            with CrawlPool(workers=min(CRAWL_WORKERS, len(browser_posts))) as crawl_pool:
+                for url, content, error in crawl_pool.crawl(list(by_url)):
+                    post = by_url[url]
+                    if content:
+                        fetched += 1
+                        self.corpus.add(url, content, post.get('title', ''), post['last_modified'],
+                                        source=f"ingest:{kind}:browser")
+                    else:
+                        failed += 1
+                        metrics.count('ingest', 'errors', error_class='CrawlPool')
+                        attempts = self.corpus.record_failure(self.blog_key, post, error)
+                        logger.error("글 수집 오류 (%s, %d회째): %s", url, attempts, error)
+        metrics.count('ingest', 'fetched_posts', fetched)
+        return fetched, failed
+
+
+# 사이트별 본문 추출기
+EXTRACTOR_STATS_PATH = os.path.join(DATA_DIR, "extractor_stats.json")
+SELECTOR_WAIT_TIMEOUT = 10000
+MIN_CONTENT_LENGTH = 100
+# 본문에서 제외할 태그 (정적 HTML 추출용)
+NOISE_TAGS = ['script', 'style', 'nav', 'header', 'footer']
+# 선택자가 모두 실패했을 때 쓰는 간단한 가독성 휴리스틱:
+# 직계 <p> 텍스트가 가장 많은 요소의 본문을 고름
+READABILITY_SCRIPT = """() => {
+    let best = null, bestScore = 0;
+    for (const el of document.querySelectorAll('article, main, section, div')) {
+        let score = 0;
+        for (const p of el.querySelectorAll(':scope > p, :scope > div > p')) {
+            const text = p.innerText.trim();
+            if (text.length > 25) score += text.length + (text.match(/[,.]/g) || []).length * 10;
+        }
+        if (score > bestScore) { best = el; bestScore = score; }
+    }
+    return best ? best.innerText : '';
+}"""
+
+
+class ContentNotFoundError(ValueError):
+    """정적 HTML에서 본문을 찾지 못함 (브라우저 크롤링으로 다시 시도할 대상)"""
+
+
+class SiteExtractor:
+    """사이트 하나의 추출 규칙 (호스트, 본문 iframe, 순서 있는 본문/제목 선택자 전략)"""
+
+    def __init__(self, name, hosts, content_selectors, title_selectors=(), frame=None, readability=False):
+        self.name = name
+        self.hosts = hosts
+        self.content_selectors = list(content_selectors)
+        self.title_selectors = list(title_selectors)
+        self.frame = frame
+        self.readability = readability
+
+    def matches(self, host):
+        return any(host == h or host.endswith('.' + h) for h in self.hosts)
+
+
+# 호스트가 맞는 첫 추출기를 사용 (m.blog.naver.com이 blog.naver.com보다 먼저)
+SITE_EXTRACTORS = [
+    SiteExtractor('naver_mobile', ['m.blog.naver.com'],
+                  ['.se-main-container', '#viewTypeSelector', '.post_ct', '#postViewArea'],
+                  ['.se-title-text', 'h3.se_textarea', '.tit_h3']),
+    SiteExtractor('naver', ['blog.naver.com'],
+                  ['.se-main-container', '#postViewArea', '.se_component_wrap'],
+                  ['.se-title-text', 'h3.se_textarea', '.pcol1'], frame='mainFrame'),
+    SiteExtractor('tistory', ['tistory.com'],
+                  ['.contents_style', '.entry-content', '.tt_article_useless_p_margin', 'article'],
+                  ['h1.tit_post', '.title_post', 'h2.title', 'article h1']),
+    SiteExtractor('brunch', ['brunch.co.kr'],
+                  ['.wrap_body', '.wrap_body_frame', 'article'],
+                  ['h1.cover_title', '.cover_title']),
+    SiteExtractor('velog', ['velog.io'],
+                  ['.atom-one', 'div[class*="markdown"]', 'article'],
+                  ['h1']),
+]
+GENERAL_EXTRACTOR = SiteExtractor('general', [],
+                                  ['article', 'main', '.post-content', '.entry-content', '.content', '[role="main"]'],
+                                  readability=True)
+
+
+def extractor_for_url(url):
+    """URL 호스트에 맞는 사이트 추출기 (없으면 일반 추출기)"""
+    host = (urlparse(url).hostname or '').lower()
+    return next((e for e in SITE_EXTRACTORS if e.matches(host)), GENERAL_EXTRACTOR)
+
+
+def tried_selectors(extractor):
+    """본문 추출 실패 메시지용: 사이트 추출기와 일반 추출기 대체에서 시도한 선택자 목록"""
+    tried = [extractor] if extractor is GENERAL_EXTRACTOR else [extractor, GENERAL_EXTRACTOR]
+    return ' → '.join(f"{e.name}: {', '.join(e.content_selectors + (['가독성 휴리스틱'] if e.readability else []))}"
+                      for e in tried)
+
+
+class ExtractorStats:
+    """사이트/선택자별 성공률과 소요 시간 기록 (성공률 순으로 선택자 정렬, 소요 시간은 참고용)"""
+
+    def __init__(self, path=EXTRACTOR_STATS_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stats = None
+        # 마지막 drain() 이후 기록분 (크롤링 워커 프로세스가 부모에게 넘길 때 사용)
+        self.pending = {}
+
+    def load(self):
+        if self.stats is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.stats = json.load(f)
+            except (OSError, ValueError):
+                self.stats = {}
+        return self.stats
+
+    @staticmethod
+    def _add(stats, site, selector, attempts, successes, total_ms):
+        entry = stats.setdefault(site, {}).setdefault(selector, {'attempts': 0, 'successes': 0, 'total_ms': 0.0})
+        entry['attempts'] += attempts
+        entry['successes'] += successes
+        entry['total_ms'] += total_ms
+
+    def record(self, site, selector, success, elapsed_ms):
+        with self.lock:
+            for stats in (self.load(), self.pending):
+                self._add(stats, site, selector, 1, int(success), elapsed_ms)
+        metrics.count('crawl', 'selector_hits' if success else 'selector_misses', site=site, selector=selector)
+
+    def order(self, site, selectors):
+        """성공률(표본이 적으면 0.5 쪽으로 보정)이 높은 선택자부터 정렬
+
+        선택자별 조회 시간은 1ms 미만이라 순서에 쓰지 않고, 성공률이 같으면 선언 순서를 유지합니다.
+        """
+        with self.lock:
+            site_stats = dict(self.load().get(site, {}))
+
+        def key(selector):
+            entry = site_stats.get(selector)
+            if not entry:
+                return -0.5
+            return -(entry['successes'] + 1) / (entry['attempts'] + 2)
+
+        return sorted(selectors, key=key)
+
+    def drain(self):
+        """마지막 drain() 이후 기록분을 꺼내고 비우기"""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        return pending
+
+    def merge(self, delta):
+        """다른 프로세스에서 받은 기록분 합치기"""
+        with self.lock:
+            stats = self.load()
+            for site, selectors in delta.items():
+                for selector, entry in selectors.items():
+                    self._add(stats, site, selector, entry['attempts'], entry['successes'], entry['total_ms'])
+
+    def save(self):
+        with self.lock:
+            if self.stats is None:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                    json.dump(self.stats, f, ensure_ascii=False, indent=2)
+                os.replace(self.path + '.tmp', self.path)
+            except OSError as e:
+                metrics.error('extractor', e)
+                logger.warning("선택자 통계 저장 오류: %s", e)
+
+
+extractor_stats = ExtractorStats()
+
+
+def extract_soup(soup, extractor, source='html'):
+    """정적 HTML에서 선택자 전략 순서대로 본문 추출 (실패하면 None)"""
+    site = f"{extractor.name}:{source}"
+    title = ''
+    for selector in extractor.title_selectors:
+        element = soup.select_one(selector)
+        if element and element.get_text(strip=True):
+            title = element.get_text(strip=True)
+            break
+
+    for selector in extractor_stats.order(site, extractor.content_selectors):
+        start = time.perf_counter()
+        element = soup.select_one(selector)
+        text = ''
+        if element:
+            # 다음 선택자가 원본 문서를 보도록 복사본에서 잡음 태그 제거
+            element = copy.copy(element)
+            for noise in element(NOISE_TAGS):
+                noise.decompose()
+            text = element.get_text(separator='\n', strip=True)
+        success = len(text) >= MIN_CONTENT_LENGTH
+        extractor_stats.record(site, selector, success, (time.perf_counter() - start) * 1000)
+        if success:
+            return f"{title}\n\n{text}" if title else text
+
+    if extractor.readability:
+        # 최후의 수단: 모든 p 태그 텍스트
+        paragraphs = [p.get_text(strip=True) for p in soup.find_all('p') if p.get_text(strip=True)]
+        if paragraphs:
+            return '\n\n'.join(paragraphs)
+    return None
+
+
 class CrawlThread(QThread):
     """URL에서 블로그 글을 크롤링하는 스레드 (Playwright 사용)"""
     finished = pyqtSignal(str)
     error = pyqtSignal(str)
 
+    # Chromium 추가 실행 인자 (벤치마크에서 호스트를 로컬 서버로 매핑할 때 사용)
+    launch_args = []
+
     def __init__(self, url):
         super().__init__()
         self.url = url
 
     def run(self):
+        start = time.perf_counter()
         try:
             # Playwright를 사용한 크롤링
             with sync_playwright() as p:
                 # 헤드리스 모드로 브라우저 실행
-                browser = p.chromium.launch(headless=True)
+                with metrics.timer('crawl', 'browser_launch_ms'):
+                    browser = p.chromium.launch(headless=True, args=self.launch_args)
                 context = browser.new_context(
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+                    user_agent=USER_AGENT
                 )
                 page = context.new_page()
 
-                # 페이지 로드 (네트워크 대기)
-                page.goto(self.url, wait_until='networkidle', timeout=30000)
-
-                # 네이버 블로그 감지
-                if 'blog.naver.com' in self.url:
-                    content = self.extract_naver_blog_playwright(page)
-                # 티스토리 블로그 감지
-                elif 'tistory.com' in self.url:
-                    content = self.extract_tistory_blog_playwright(page)
-                # 일반 블로그/웹사이트
-                else:
-                    content = self.extract_general_content_playwright(page)
+                content, extractor = self.crawl_page(page, self.url)
 
                 browser.close()
+                extractor_stats.save()
 
+                metrics.observe('crawl', 'total_ms', (time.perf_counter() - start) * 1000)
                 if content:
+                    metrics.observe('crawl', 'content_bytes', len(content.encode('utf-8')))
                     self.finished.emit(content)
                 else:
-                    self.error.emit("블로그 내용을 추출할 수 없습니다. 직접 복사해서 붙여넣어 주세요.")
+                    metrics.count('crawl', 'empty_results', site=extractor.name)
+                    self.error.emit(f"블로그 내용을 추출할 수 없습니다 ({tried_selectors(extractor)} 모두 실패). "
+                                    "직접 복사해서 붙여넣어 주세요.")
 
         except Exception as e:
+            metrics.error('crawl', e)
             self.error.emit(f"크롤링 오류: {str(e)}")
 
-    def extract_naver_blog_playwright(self, page):
-        """네이버 블로그 콘텐츠 추출 (Playwright)"""
-        try:
-            # iframe이 있는지 확인
-            frames = page.frames
-            main_frame = None
-
-            # mainFrame 찾기
-            for frame in frames:
-                if 'mainFrame' in frame.url or frame.name == 'mainFrame':
-                    main_frame = frame
-                    break
-
-            if main_frame:
-                # iframe 내부 콘텐츠 대기
-                main_frame.wait_for_selector('.se-main-container, #postViewArea', timeout=10000)
-
-                # 제목 추출
-                title = ""
-                try:
-                    title_elem = main_frame.query_selector('.se-title-text, .pcol1')
-                    if title_elem:
-                        title = title_elem.inner_text()
-                except:
-                    pass
-
-                # 본문 추출
-                content_elem = main_frame.query_selector('.se-main-container, #postViewArea')
-                if content_elem:
-                    content = content_elem.inner_text()
-                    if title:
-                        return f"{title}\n\n{content}"
-                    return content
-            else:
-                # iframe이 없는 경우 직접 추출
-                page.wait_for_selector('.se-main-container, #postViewArea', timeout=10000)
-
-                title = ""
-                try:
-                    title_elem = page.query_selector('.se-title-text, .pcol1')
-                    if title_elem:
-                        title = title_elem.inner_text()
-                except:
-                    pass
-
-                content_elem = page.query_selector('.se-main-container, #postViewArea')
-                if content_elem:
-                    content = content_elem.inner_text()
-                    if title:
-                        return f"{title}\n\n{content}"
-                    return content
-        except Exception as e:
-            print(f"네이버 블로그 추출 오류: {e}")
-        return None
+    @staticmethod
+    def crawl_page(page, url):
+        """페이지를 열고 사이트 추출기로 본문 추출, (본문, 추출기) 반환"""
+        # 페이지 로드 (네트워크 대기)
+        with metrics.timer('crawl', 'page_load_ms'):
+            page.goto(url, wait_until='networkidle', timeout=30000)
+
+        # 리다이렉트 이후 최종 주소의 호스트로 사이트 추출기 선택
+        extractor = extractor_for_url(page.url)
+        content = CrawlThread.extract_with(page, extractor)
+        if not content and extractor is not GENERAL_EXTRACTOR:
+            metrics.count('crawl', 'general_fallbacks', site=extractor.name)
+            content = CrawlThread.extract_with(page, GENERAL_EXTRACTOR)
+        return content, extractor
+
+    @staticmethod
+    def find_frame(page, name):
+        """이름 또는 주소로 본문 iframe 찾기 (없으면 페이지 자체)"""
+        for frame in page.frames:
+            if frame.name == name or name in frame.url:
+                return frame
+        return page
+
+    @staticmethod
+    def extract_with(page, extractor):
+        """선택자 전략을 통계 순서대로 시도해서 본문 추출 (Playwright)
+
+        모든 본문 선택자 중 하나가 나타날 때까지 한 번만 기다린 뒤, 나머지는
+        기다리지 않고 query_selector로 확인하므로 죽은 선택자마다 시간 초과를 기다리지 않습니다.
+        """
+        target = CrawlThread.find_frame(page, extractor.frame) if extractor.frame else page
+        selectors = extractor_stats.order(extractor.name, extractor.content_selectors)
 
-    def extract_tistory_blog_playwright(self, page):
-        """티스토리 블로그 콘텐츠 추출 (Playwright)"""
         try:
-            # 본문 로딩 대기
-            page.wait_for_selector('article, .entry-content, .contents_style', timeout=10000)
-
-            # 제목 추출
-            title = ""
+            with metrics.timer('crawl', 'selector_wait_ms', site=extractor.name):
+                target.wait_for_selector(', '.join(selectors), timeout=SELECTOR_WAIT_TIMEOUT)
+        except PlaywrightTimeoutError:
+            metrics.count('crawl', 'selector_timeouts', site=extractor.name)
+
+        # 공통 대기는 selector_wait_ms로 따로 기록하고, 선택자 통계에는 각 조회 시간만 기록
+        content = None
+        for selector in selectors:
+            start = time.perf_counter()
             try:
-                title_elem = page.query_selector('h1.tit_post, h2.title, .title_post')
-                if title_elem:
-                    title = title_elem.inner_text()
-            except:
-                pass
+                element = target.query_selector(selector)
+                text = element.inner_text().strip() if element else ''
+            except PlaywrightError as e:
+                metrics.error('crawl', e)
+                logger.warning("%s 선택자 오류 (%s): %s", extractor.name, selector, e)
+                text = ''
+            success = len(text) >= MIN_CONTENT_LENGTH
+            extractor_stats.record(extractor.name, selector, success, (time.perf_counter() - start) * 1000)
+            if success:
+                content = text
+                break
+
+        if not content and extractor.readability:
+            start = time.perf_counter()
+            try:
+                text = target.evaluate(READABILITY_SCRIPT).strip()
+            except PlaywrightError as e:
+                metrics.error('crawl', e)
+                logger.warning("가독성 추출 오류: %s", e)
+                text = ''
+            extractor_stats.record(extractor.name, 'readability', bool(text), (time.perf_counter() - start) * 1000)
+            content = text or None
+        if not content:
+            return None
 
-            # 본문 추출
-            content_elem = page.query_selector('.contents_style, .entry-content, article')
-            if content_elem:
-                content = content_elem.inner_text()
-                if title:
-                    return f"{title}\n\n{content}"
-                return content
-        except Exception as e:
-            print(f"티스토리 블로그 추출 오류: {e}")
-        return None
+        title = CrawlThread.extract_title(target, extractor)
+        return f"{title}\n\n{content}" if title else content
 
-    def extract_general_content_playwright(self, page):
-        """일반 웹사이트 콘텐츠 추출 (Playwright)"""
+    @staticmethod
+    def extract_title(target, extractor):
+        """제목 선택자를 순서대로 시도 (기다리지 않음)"""
+        for selector in extractor.title_selectors:
+            try:
+                element = target.query_selector(selector)
+                title = element.inner_text().strip() if element else ''
+            except PlaywrightError:
+                continue
+            if title:
+                return title
+        return ''
+
+
+# 멀티 프로세스 크롤링 풀 (워커마다 브라우저 하나를 계속 유지)
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", "0")) or os.cpu_count() or 2
+CRAWL_WORKER_MAX_PAGES = 200
+CRAWL_WORKER_MAX_RSS_MB = 1500
+CRAWL_HEARTBEAT_INTERVAL = 5
+CRAWL_HEARTBEAT_TIMEOUT = 30
+CRAWL_TASK_TIMEOUT = 90
+CRAWL_TASK_RETRIES = 1
+# 한 번도 준비되지 못하고 연달아 죽는 워커 허용 횟수 (워커 수 배수, 브라우저 미설치 등)
+CRAWL_MAX_FAILED_STARTS = 2
+# 브라우저/컨텍스트가 닫혀 더 쓸 수 없을 때의 Playwright 오류 메시지
+# (net::ERR_CONNECTION_CLOSED 같은 페이지 로드 오류와 구분하기 위해 정확한 문구로 비교)
+PLAYWRIGHT_TARGET_CLOSED = "Target page, context or browser has been closed"
+
+
+def process_tree_rss_mb():
+    """현재 프로세스와 자식 프로세스(Playwright 드라이버, Chromium)의 메모리 사용량 합계 (MB)"""
+    process = psutil.Process()
+    total = process.memory_info().rss
+    for child in process.children(recursive=True):
         try:
-            # 일반적인 콘텐츠 영역 대기
-            page.wait_for_selector('article, main, .post-content, .entry-content', timeout=10000)
-
-            # 여러 선택자 시도
-            selectors = [
-                'article',
-                'main',
-                '.post-content',
-                '.entry-content',
-                '.content',
-                '[role="main"]'
-            ]
-
-            for selector in selectors:
-                try:
-                    content_elem = page.query_selector(selector)
-                    if content_elem:
-                        text = content_elem.inner_text()
-                        if text and len(text) > 100:  # 최소 100자 이상
-                            return text
-                except:
-                    continue
-
-            # 모든 p 태그 텍스트 가져오기 (최후의 수단)
-            p_elements = page.query_selector_all('p')
-            if p_elements:
-                paragraphs = [p.inner_text() for p in p_elements if p.inner_text().strip()]
-                if paragraphs:
-                    return '\n\n'.join(paragraphs)
-
-        except Exception as e:
-            print(f"일반 콘텐츠 추출 오류: {e}")
-        return None
-
-    def extract_naver_blog(self, soup):
-        """네이버 블로그 콘텐츠 추출"""
-        # 네이버 블로그는 iframe 내부에 콘텐츠가 있음
-        # mainFrame이라는 iframe의 src를 가져와서 다시 크롤링해야 함
+            total += child.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / (1024 * 1024)
+
+
+def crawl_worker(conn, launch_args, max_pages, max_rss_mb, log_name):
+    """크롤링 워커 프로세스: 브라우저 하나를 유지하며 파이프로 받은 URL을 처리
+
+    작업이 없을 때는 주기적으로 heartbeat를 보내고, 처리한 페이지 수나 메모리가
+    한도를 넘으면 마지막 결과에 retiring을 표시하고 종료합니다 (부모가 새 워커로 교체).
+    Chromium이 죽거나 연결이 끊기면 결과에 browser_lost를 표시하고 종료해서,
+    부모가 워커를 교체하고 그 URL을 다시 시도하게 합니다.
+    """
+    # 여러 프로세스가 같은 회전 로그를 건드리지 않도록 워커별 로그 사용
+    metrics.log_path = os.path.join(DATA_DIR, "logs", f"metrics-{log_name}.jsonl")
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=launch_args)
+        context = browser.new_context(user_agent=USER_AGENT)
+        conn.send(('ready', None))
+        pages = 0
+        while True:
+            if not conn.poll(CRAWL_HEARTBEAT_INTERVAL):
+                if not browser.is_connected():
+                    # 쉬는 중에 브라우저가 죽으면 종료 (부모가 exited로 보고 교체)
+                    break
+                conn.send(('heartbeat', process_tree_rss_mb()))
+                continue
+            url = conn.recv()
+            if url is None:
+                break
+
+            start = time.perf_counter()
+            page = None
+            target_closed = False
+            try:
+                page = context.new_page()
+                content, extractor = CrawlThread.crawl_page(page, url)
+                error = None if content else f"본문을 찾을 수 없습니다 ({tried_selectors(extractor)})"
+            except Exception as e:
+                content, error = None, str(e)
+                target_closed = isinstance(e, PlaywrightError) and PLAYWRIGHT_TARGET_CLOSED in str(e)
+            finally:
+                if page:
+                    try:
+                        page.close()
+                    except PlaywrightError:
+                        pass
+            pages += 1
+            rss_mb = process_tree_rss_mb()
+            browser_lost = target_closed or not browser.is_connected()
+            retiring = browser_lost or pages >= max_pages or rss_mb > max_rss_mb
+            conn.send(('result', {
+                'content': content, 'error': error, 'elapsed_ms': (time.perf_counter() - start) * 1000,
+                'rss_mb': rss_mb, 'selector_stats': extractor_stats.drain(), 'retiring': retiring,
+                'browser_lost': browser_lost,
+            }))
+            if retiring:
+                break
         try:
-            # 제목 추출
-            title = soup.find('h3', class_='se_textarea')
-            if not title:
-                title = soup.find('div', class_='se-title-text')
-
-            # 본문 추출
-            content_area = soup.find('div', class_='se-main-container')
-            if not content_area:
-                content_area = soup.find('div', id='postViewArea')
-
-            if content_area:
-                # 텍스트만 추출
-                text = content_area.get_text(separator='\n', strip=True)
-                if title:
-                    return f"{title.get_text(strip=True)}\n\n{text}"
-                return text
-        except:
+            browser.close()
+        except PlaywrightError:
             pass
-        return None
 
-    def extract_tistory_blog(self, soup):
-        """티스토리 블로그 콘텐츠 추출"""
-        try:
-            # 제목 추출
-            title = soup.find('h1', class_='tit_post') or soup.find('h2', class_='title')
-
-            # 본문 추출
-            content_area = soup.find('div', class_='contents_style') or \
-                          soup.find('div', class_='entry-content') or \
-                          soup.find('article')
-
-            if content_area:
-                text = content_area.get_text(separator='\n', strip=True)
-                if title:
-                    return f"{title.get_text(strip=True)}\n\n{text}"
-                return text
-        except:
-            pass
-        return None
 
-    def extract_general_content(self, soup):
-        """일반 웹사이트 콘텐츠 추출"""
-        try:
-            # 일반적인 블로그 구조에서 콘텐츠 추출
-            # article, main, .post, .entry 등의 일반적인 클래스/태그 시도
-            content_area = soup.find('article') or \
-                          soup.find('main') or \
-                          soup.find('div', class_='post-content') or \
-                          soup.find('div', class_='entry-content') or \
-                          soup.find('div', class_='content')
-
-            if content_area:
-                # script, style 태그 제거
-                for script in content_area(['script', 'style', 'nav', 'header', 'footer']):
-                    script.decompose()
-
-                text = content_area.get_text(separator='\n', strip=True)
-                return text
-
-            # 모든 p 태그의 텍스트 가져오기 (최후의 수단)
-            paragraphs = soup.find_all('p')
-            if paragraphs:
-                return '\n\n'.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
-
-        except:
-            pass
-        return None
+class CrawlPool:
+    """Playwright 크롤링을 여러 프로세스로 나누는 풀
+
+    부모가 쉬고 있는 워커에게 파이프로 URL을 하나씩 넘기고 결과를 받습니다.
+    워커마다 파이프가 따로 있어서 한 워커가 죽어도 다른 워커의 통신에는 영향이 없습니다.
+    응답이 없거나 작업 시간이 너무 긴 워커는 종료 후 새로 띄우고, 맡았던 URL은
+    CRAWL_TASK_RETRIES번까지 다시 시도합니다. 워커 수는 CRAWL_WORKERS 환경 변수로 정합니다.
+
+        with CrawlPool(workers=4) as pool:
+            for url, content, error in pool.crawl(urls):
+                ...
+    """
+
+    def __init__(self, workers=CRAWL_WORKERS, launch_args=None,
+                 max_pages=CRAWL_WORKER_MAX_PAGES, max_rss_mb=CRAWL_WORKER_MAX_RSS_MB):
+        self.size = max(1, workers)
+        self.launch_args = list(CrawlThread.launch_args if launch_args is None else launch_args)
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.context = multiprocessing.get_context('spawn')
+        self.workers = {}
+        self.retired = []
+        self.failed_starts = 0
+
+    def __enter__(self):
+        for slot in range(self.size):
+            self.start_worker(slot)
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start_worker(self, slot):
+        conn, child_conn = self.context.Pipe()
+        process = self.context.Process(
+            target=crawl_worker,
+            args=(child_conn, self.launch_args, self.max_pages, self.max_rss_mb, f"crawl-worker-{slot}"),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        self.workers[slot] = {'process': process, 'conn': conn, 'ready': False,
+                              'task': None, 'task_started': None, 'last_seen': time.monotonic()}
+        metrics.count('crawl_pool', 'worker_starts')
+
+    def restart_worker(self, slot, reason):
+        """워커를 정리하고 같은 자리에 새 워커 띄우기"""
+        worker = self.workers[slot]
+        if not worker['ready']:
+            self.failed_starts += 1
+            if self.failed_starts > CRAWL_MAX_FAILED_STARTS * self.size:
+                raise RuntimeError("크롤링 워커를 시작할 수 없습니다 (Playwright 브라우저 설치를 확인하세요)")
+        worker['conn'].close()
+        if reason in ('recycle', 'browser_lost'):
+            # 스스로 종료하는 중인 워커는 기다리지 않고 나중에 정리
+            self.retired.append(worker['process'])
+        else:
+            if worker['process'].is_alive():
+                worker['process'].terminate()
+            worker['process'].join(timeout=5)
+        self.retired = [process for process in self.retired if process.is_alive()]
+        metrics.count('crawl_pool', 'worker_restarts', reason=reason)
+        self.start_worker(slot)
+
+    @staticmethod
+    def requeue(task, attempts, pending):
+        """재시도 횟수가 남았으면 작업을 대기열 앞에 다시 넣고 True 반환"""
+        attempts[task[0]] = attempts.get(task[0], 0) + 1
+        if attempts[task[0]] > CRAWL_TASK_RETRIES:
+            return False
+        pending.appendleft(task)
+        return True
+
+    def crawl(self, urls):
+        """URL 목록을 크롤링하며 끝나는 순서대로 (url, 본문, 오류) 생성"""
+        pending = deque(enumerate(urls))
+        total = remaining = len(pending)
+        attempts = {}
+        start = time.perf_counter()
+
+        while remaining:
+            # 쉬고 있는 워커에게 작업 배분
+            for worker in self.workers.values():
+                if worker['ready'] and worker['task'] is None and pending:
+                    worker['task'] = pending.popleft()
+                    worker['task_started'] = time.monotonic()
+                    worker['conn'].send(worker['task'][1])
+
+            conns = {worker['conn']: slot for slot, worker in self.workers.items()}
+            for conn in multiprocessing.connection.wait(list(conns), timeout=1):
+                slot = conns[conn]
+                worker = self.workers[slot]
+                try:
+                    kind, payload = conn.recv()
+                except (EOFError, OSError):
+                    # 워커가 죽음 (아래 상태 점검에서 교체)
+                    continue
+                worker['last_seen'] = time.monotonic()
+                if kind == 'ready':
+                    worker['ready'] = True
+                    self.failed_starts = 0
+                elif kind == 'result' and worker['task']:
+                    task = worker['task']
+                    worker['task'] = None
+                    extractor_stats.merge(payload['selector_stats'])
+                    metrics.observe('crawl_pool', 'task_ms', payload['elapsed_ms'])
+                    metrics.observe('crawl_pool', 'worker_rss_mb', payload['rss_mb'])
+                    if payload['retiring']:
+                        # 작업을 더 넘기기 전에 교체
+                        self.restart_worker(slot, 'browser_lost' if payload['browser_lost'] else 'recycle')
+                    # 브라우저가 죽어서 실패한 작업은 새 워커에서 다시 시도
+                    if payload['browser_lost'] and self.requeue(task, attempts, pending):
+                        continue
+                    remaining -= 1
+                    yield task[1], payload['content'], payload['error']
+
+            # 상태 점검: 죽었거나, 응답이 없거나, 작업이 너무 오래 걸리는 워커 교체
+            now = time.monotonic()
+            for slot, worker in list(self.workers.items()):
+                if not worker['process'].is_alive():
+                    reason = 'exited'
+                elif worker['task'] and now - worker['task_started'] > CRAWL_TASK_TIMEOUT:
+                    reason = 'task_timeout'
+                elif not worker['task'] and worker['ready'] and now - worker['last_seen'] > CRAWL_HEARTBEAT_TIMEOUT:
+                    reason = 'unresponsive'
+                elif not worker['ready'] and now - worker['last_seen'] > CRAWL_TASK_TIMEOUT:
+                    reason = 'startup_timeout'
+                else:
+                    continue
+                task = worker['task']
+                self.restart_worker(slot, reason)
+                if task and not self.requeue(task, attempts, pending):
+                    remaining -= 1
+                    yield task[1], None, f"크롤링 워커 오류 ({reason})"
+
+        elapsed = time.perf_counter() - start
+        if total and elapsed:
+            metrics.observe('crawl_pool', 'pages_per_s', total / elapsed, workers=self.size)
+        extractor_stats.save()
+
+    def close(self):
+        """워커에게 종료 신호를 보내고 정리"""
+        for worker in self.workers.values():
+            try:
+                worker['conn'].send(None)
+            except OSError:
+                pass
+        for process in [worker['process'] for worker in self.workers.values()] + self.retired:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        for worker in self.workers.values():
+            worker['conn'].close()
+        self.workers = {}
+        self.retired = []
 
 
 class AnalyzeThread(QThread):
@@ -262,50 +2569,149 @@ class AnalyzeThread(QThread):
         super().__init__()
         self.client = client
         self.reference_text = reference_text
+        # 분석 모델 호출별 사용량 (generation_metrics 저장용)
+        self.usage_log = []
 
     def run(self):
         try:
-            prompt = f"""다음 블로그 글을 분석하여 구조와 특징을 추출해주세요.
+            analysis_result = analyze_reference_text(self.client, self.reference_text, self.usage_log)
+            self.finished.emit(analysis_result)
 
-레퍼런스 글:
-{self.reference_text}
+        except Exception as e:
+            self.error.emit(str(e))
 
-다음 항목들을 분석해주세요:
-1. 제목 패턴 및 스타일
-2. 서론 구성 방식 (문제 제기, 공감, 호기심 유발 등)
-3. 본론 섹션 개수와 각 섹션의 구조
-4. 소제목 스타일과 패턴
-5. 문단 길이와 구성 방식
-6. 결론 방식 (요약, CTA, 질문 등)
-7. 특징적인 문체 요소 (문장 길이, 어조, 키워드 사용 등)
-8. 전체적인 글의 톤 앤 매너
 
-각 항목에 대해 구체적으로 분석하고, 이 스타일을 재현하기 위한 핵심 요소를 정리해주세요."""
+class MultiAnalyzeThread(QThread):
+    """여러 레퍼런스를 동시에 분석하고 하나의 합의 스타일 프로필로 합치는 스레드"""
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+    progress = pyqtSignal(str)
+    profile_saved = pyqtSignal(str)
 
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=prompt
-            )
-            analysis_result = response.text
-            self.finished.emit(analysis_result)
+    def __init__(self, client, supabase, references):
+        super().__init__()
+        self.client = client
+        self.supabase = supabase
+        self.references = references
+        self.usage_log = []
+
+    def run(self):
+        try:
+            reference_hashes = sorted(content_hash(r) for r in self.references)
+            profile_hash = content_hash(','.join(reference_hashes))
+
+            # 같은 레퍼런스 조합의 프로필이 이미 있으면 재사용
+            stored = self.load_profile(profile_hash)
+            if stored:
+                metrics.count('analyze', 'profile_cache_hits')
+                self.profile_saved.emit(stored['id'])
+                self.finished.emit(stored['profile'])
+                return
+
+            # 레퍼런스별 분석은 병렬로 실행 (전체 시간 ≈ 가장 느린 레퍼런스)
+            analyses = [None] * len(self.references)
+            done = 0
+            with metrics.timer('analyze', 'parallel_ms', references=len(self.references)):
+                with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_ANALYSES, len(self.references))) as pool:
+                    futures = {pool.submit(analyze_reference_text, self.client, r, self.usage_log): i
+                               for i, r in enumerate(self.references)}
+                    for future in as_completed(futures):
+                        analyses[futures[future]] = future.result()
+                        done += 1
+                        self.progress.emit(f"레퍼런스 분석 중... {done}/{len(self.references)}")
+
+            blended = blend_structure_metrics(self.references)
+            self.progress.emit("스타일 프로필 병합 중...")
+            profile = model_router.generate(self.client, self.build_merge_prompt(analyses, blended), 'analyze_merge',
+                                            usage_log=self.usage_log)
+
+            profile_id = self.save_profile(profile_hash, reference_hashes, blended, profile)
+            if profile_id:
+                self.profile_saved.emit(profile_id)
+            self.finished.emit(profile)
 
         except Exception as e:
             self.error.emit(str(e))
 
+    def build_merge_prompt(self, analyses, blended):
+        """레퍼런스별 분석 결과를 합의 프로필로 합치는 프롬프트"""
+        sections = '\n\n'.join(f"## 레퍼런스 {i + 1} 분석\n{a}" for i, a in enumerate(analyses))
+        average_section = (sum(blended['section_lengths']) // len(blended['section_lengths'])
+                           if blended['section_lengths'] else 0)
+        return f"""다음은 같은 브랜드의 성과가 좋은 블로그 글 {len(analyses)}개를 각각 분석한 결과입니다.
+
+{sections}
+
+# 레퍼런스 평균 구조 지표
+- 평균 본문 길이: {blended['total_length']}자
+- 평균 섹션 수: {blended['section_count']}개
+- 평균 섹션 길이: {average_section}자
+- 평균 문단 수: {blended['paragraph_count']}개
+
+위 분석들을 하나의 합의 스타일 프로필로 합쳐주세요.
+- 여러 레퍼런스에서 공통으로 나타나는(지배적인) 패턴을 우선으로 정리
+- 레퍼런스마다 다른 항목은 가장 흔한 방식을 기준으로 하고, 허용 가능한 변형을 함께 적기
+- 원래 분석 항목(제목 패턴, 서론, 본론 섹션 구조, 소제목, 문단, 결론, 문체, 톤 앤 매너) 순서를 유지
+- 위 평균 구조 지표를 본론 섹션 구조와 문단 항목에 반영
+
+합쳐진 스타일 프로필만 출력해주세요."""
+
+    def load_profile(self, profile_hash):
+        """Supabase에서 같은 레퍼런스 조합의 프로필 조회"""
+        if not self.supabase:
+            return None
+        try:
+            response = self.supabase.table("style_profiles")\
+                .select("id, profile")\
+                .eq("profile_hash", profile_hash)\
+                .limit(1)\
+                .execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            metrics.error('supabase', e)
+            logger.error("스타일 프로필 조회 오류: %s", e)
+            return None
+
+    def save_profile(self, profile_hash, reference_hashes, blended, profile):
+        """합의 프로필을 style_profiles에 저장하고 ID 반환"""
+        if not self.supabase:
+            return None
+        try:
+            with metrics.timer('supabase', 'insert_ms', table='style_profiles'):
+                response = self.supabase.table("style_profiles").upsert({
+                    "profile_hash": profile_hash,
+                    "reference_hashes": reference_hashes,
+                    "reference_count": len(reference_hashes),
+                    "metrics": blended,
+                    "profile": profile,
+                }, on_conflict="profile_hash").execute()
+            return response.data[0]['id'] if response.data else None
+        except Exception as e:
+            metrics.error('supabase', e)
+            logger.error("스타일 프로필 저장 오류: %s", e)
+            return None
+
 
 class GenerateThread(QThread):
     """새 글 생성을 백그라운드에서 처리하는 스레드"""
     finished = pyqtSignal(str)
     error = pyqtSignal(str)
+    progress = pyqtSignal(str)
+    validated = pyqtSignal(list)
 
-    def __init__(self, client, reference_text, analysis_result, topic, keywords, requirements):
+    def __init__(self, client, reference_text, analysis_result, topic, keywords, requirements,
+                 stage='generate'):
         super().__init__()
         self.client = client
+        # 라우팅 정책 단계 (캘린더 일괄 생성은 'generate_batch')
+        self.stage = stage
         self.reference_text = reference_text
         self.analysis_result = analysis_result
         self.topic = topic
         self.keywords = keywords
         self.requirements = requirements
+        # 이 글 생성에 쓰인 모델 호출별 사용량 (generation_metrics 저장용)
+        self.usage_log = []
 
     def run(self):
         try:
@@ -341,33 +2747,527 @@ class GenerateThread(QThread):
 
 완성된 블로그 글만 출력해주세요 (분석이나 설명 없이)."""
 
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=prompt
-            )
-            generated_content = response.text
+            with metrics.timer('generate', 'total_ms'):
+                # 레퍼런스가 길수록 구조 재현이 어려우므로 레퍼런스 길이까지 포함해 모델 선택
+                draft = model_router.generate(self.client, prompt, self.stage, usage_log=self.usage_log,
+                                              size=len(prompt) + len(self.reference_text))
+                generated_content = self.validate_and_fix(draft)
             self.finished.emit(generated_content)
 
         except Exception as e:
             self.error.emit(str(e))
 
+    def validate_and_fix(self, draft):
+        """레퍼런스 구조 기준으로 초안을 검증하고, 실패한 섹션만 재생성해서 교체"""
+        reference_metrics = blend_structure_metrics(split_references(self.reference_text) or [self.reference_text])
+        keywords = parse_keywords(self.keywords)
+
+        issues = validate_draft(draft, reference_metrics, keywords)
+        for _ in range(MAX_SECTION_FIX_ROUNDS):
+            # 섹션 단위로 고칠 수 있는 문제만 모음
+            fixes = {}
+            for issue in issues:
+                if issue['section'] is not None:
+                    fixes.setdefault(issue['section'], []).append(issue)
+            if not fixes:
+                break
+
+            title, body = split_title(draft)
+            sections = split_sections(body)
+            self.progress.emit(f"검증 실패 섹션 {len(fixes)}개 재생성 중...")
+            for index, section_issues in fixes.items():
+                sections[index]['body'] = self.regenerate_section(title, sections, index, section_issues)
+            draft = join_sections(title, sections)
+            issues = validate_draft(draft, reference_metrics, keywords)
+
+        metrics.observe('generate', 'validation_issues', len(issues))
+        self.validated.emit([issue['message'] for issue in issues])
+        return draft
+
+    def regenerate_section(self, title, sections, index, issues):
+        """문제가 있는 섹션 하나만 다시 작성"""
+        section = sections[index]
+        outline = '\n'.join(s['heading'] for s in sections if s['heading'] is not None)
+        keywords = [i['keyword'] for i in issues if i['check'] == 'keyword']
+        lengths = [i['target_length'] for i in issues if 'target_length' in i]
+        target_length = lengths[0] if lengths else len(section['body'])
+
+        prompt = f"""당신은 브랜드 블로그 콘텐츠 작성 전문가입니다.
+
+# 레퍼런스 글 분석 결과
+{self.analysis_result}
+
+# 작성 중인 글
+- 제목: {title}
+- 주제: {self.topic}
+- 전체 소제목 목록:
+{outline if outline else '(소제목 없음)'}
+
+# 다시 작성할 섹션
+- 소제목: {section['heading'] if section['heading'] is not None else '(서론)'}
+- 현재 내용:
+{section['body']}
+
+위 섹션의 본문만 다시 작성해주세요.
+- 분량: 공백 포함 약 {target_length}자
+- 다음 키워드를 자연스럽게 포함: {', '.join(keywords) if keywords else '없음'}
+- 레퍼런스의 문체와 톤을 유지하고, 다른 섹션과 내용이 겹치지 않게 작성
+
+소제목 없이 섹션 본문만 출력해주세요 (분석이나 설명 없이)."""
+
+        metrics.count('generate', 'section_regenerations', check=issues[0]['check'])
+        text = model_router.generate(self.client, prompt, 'generate_section', usage_log=self.usage_log).strip()
+
+        # 모델이 소제목을 다시 붙였으면 제거하고, 그래도 본문이 여러 섹션으로 나뉘면 원래 본문 유지
+        lines = text.splitlines()
+        while lines and (not lines[0].strip() or is_heading(lines, 0) or
+                         lines[0].strip().strip('*# ') == (section['heading'] or '').strip('*# ')):
+            lines.pop(0)
+        text = '\n'.join(lines).strip()
+        if not text or len(split_sections(text)) > 1:
+            metrics.count('generate', 'section_rewrites_rejected')
+            return section['body']
+        return text
+
+
+class RetrieveThread(QThread):
+    """주제/키워드로 코퍼스에서 가장 적합한 레퍼런스를 찾는 스레드"""
+    finished = pyqtSignal(list)
+    error = pyqtSignal(str)
+
+    def __init__(self, client, corpus, topic, keywords):
+        super().__init__()
+        self.client = client
+        self.corpus = corpus
+        self.topic = topic
+        self.keywords = keywords
+
+    def run(self):
+        try:
+            hits = self.corpus.search(self.client, self.topic, parse_keywords(self.keywords))
+            self.finished.emit(hits)
+        except Exception as e:
+            metrics.error('retrieve', e)
+            self.error.emit(str(e))
+
+
+class PlanThread(QThread):
+    """히스토리 색인을 갱신하고 콘텐츠 캘린더를 계획하는 스레드"""
+    finished = pyqtSignal(list)
+    error = pyqtSignal(str)
+
+    def __init__(self, supabase, seeds, count, start_date, posts_per_day):
+        super().__init__()
+        self.supabase = supabase
+        self.seeds = seeds
+        self.count = count
+        self.start_date = start_date
+        self.posts_per_day = posts_per_day
+
+    def run(self):
+        try:
+            index = KeywordIndex.load()
+            if self.supabase:
+                index.refresh(self.supabase)
+                index.save()
+            with metrics.timer('plan', 'plan_ms', seeds=len(self.seeds)):
+                plan = ContentPlanner(index).plan(self.seeds, self.count, self.start_date, self.posts_per_day)
+            self.finished.emit(plan)
+        except Exception as e:
+            metrics.error('plan', e)
+            self.error.emit(str(e))
+
+
+class BatchGenerateThread(QThread):
+    """계획된 글들을 하나의 분석된 레퍼런스로 일괄 생성하는 스레드"""
+    finished = pyqtSignal(list)
+    error = pyqtSignal(str)
+    progress = pyqtSignal(str)
+
+    def __init__(self, client, supabase, reference_text, analysis_result, plan,
+                 reference_url=None, style_profile_id=None, max_workers=BATCH_MAX_WORKERS):
+        super().__init__()
+        self.style_profile_id = style_profile_id
+        self.client = client
+        self.supabase = supabase
+        self.reference_text = reference_text
+        self.analysis_result = analysis_result
+        self.plan = plan
+        self.reference_url = reference_url
+        self.max_workers = max_workers
+        self.revisions = RevisionStore(supabase) if supabase else None
+
+    def generate_item(self, item):
+        """계획 항목 하나를 생성하고 Supabase에 저장"""
+        thread = GenerateThread(
+            self.client, self.reference_text, self.analysis_result,
+            item['topic'], item['keywords'], "", stage='generate_batch'
+        )
+        content = run_thread_sync(thread)
+        project_id = None
+        if self.supabase:
+            row = insert_project(self.supabase, {
+                "reference_text": self.reference_text,
+                "reference_url": self.reference_url,
+                "analysis_result": self.analysis_result,
+                "topic": item['topic'],
+                "keywords": item['keywords'],
+                "generated_content": content,
+                "status": "completed",
+                "tags": ["calendar", f"publish:{item['date']}"],
+                **({"style_profile_id": self.style_profile_id} if self.style_profile_id else {})
+            }, usage_log=thread.usage_log)
+            project_id = row['id'] if row else None
+            if project_id:
+                try:
+                    self.revisions.append(project_id, content, 'generate')
+                except Exception as e:
+                    logger.error("버전 기록 오류 (%s): %s", item['topic'], e)
+        return {**item, 'project_id': project_id, 'generated_content': content}
+
+    def run(self):
+        results = []
+        failures = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.generate_item, item): item for item in self.plan}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    failures += 1
+                    metrics.error('batch', e)
+                    logger.error("일괄 생성 오류 (%s): %s", item['topic'], e)
+                self.progress.emit(f"일괄 생성 중... {len(results) + failures}/{len(self.plan)} (실패 {failures})")
+
+        if not results and failures:
+            self.error.emit(f"일괄 생성이 모두 실패했습니다 ({failures}건).")
+            return
+        results.sort(key=lambda r: r['date'])
+        self.finished.emit(results)
+
+
+class DraftSyncThread(QThread):
+    """자동 저장된 변경 필드를 blog_projects 행에 반영하는 스레드
+
+    마지막으로 받은 updated_at과 같을 때만 갱신해서, 다른 곳에서 먼저 수정된
+    행을 덮어쓰지 않습니다.
+    """
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+
+    def __init__(self, supabase, project_id, fields, updated_at, revisions=None):
+        super().__init__()
+        self.supabase = supabase
+        self.project_id = project_id
+        self.fields = fields
+        self.updated_at = updated_at
+        self.revisions = revisions
+
+    def run(self):
+        try:
+            if not self.updated_at:
+                # 기준 시각 없이 갱신하면 다른 곳의 수정을 덮어쓸 수 있으므로 건너뜀
+                self.error.emit("프로젝트의 기준 updated_at이 없어 자동 동기화를 건너뜁니다.")
+                return
+            query = self.supabase.table("blog_projects")\
+                .update({**self.fields, "updated_at": datetime.now(timezone.utc).isoformat()})\
+                .eq("id", self.project_id)\
+                .eq("updated_at", self.updated_at)
+            with metrics.timer('autosave', 'sync_ms', fields=len(self.fields)):
+                response = query.execute()
+            if not response.data:
+                self.error.emit("다른 곳에서 먼저 수정된 프로젝트라 자동 동기화를 건너뜁니다.")
+                return
+            if self.revisions and 'generated_content' in self.fields:
+                # 직접 수정한 본문도 버전 기록에 남김 (실패해도 동기화 결과는 유지)
+                try:
+                    self.revisions.append(self.project_id, self.fields['generated_content'], 'manual')
+                except Exception as e:
+                    logger.error("버전 기록 오류: %s", e)
+            self.finished.emit(response.data[0])
+        except Exception as e:
+            metrics.error('autosave', e)
+            self.error.emit(f"자동 동기화 오류: {str(e)}")
+
+
+class RevisionDialog(QDialog):
+    """프로젝트 버전 기록 (두 버전 나란히 비교, 이전 버전으로 되돌리기)"""
+
+    def __init__(self, revisions, project_id, parent=None):
+        super().__init__(parent)
+        self.revisions = revisions
+        self.project_id = project_id
+        self.restored = None
+        self.restored_revision = None
+        self.setWindowTitle("🕘 버전 기록")
+        self.resize(1100, 720)
+
+        layout = QVBoxLayout(self)
+
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["버전", "시각", "출처", "저장 방식", "글자 수"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setMaximumHeight(200)
+        self.table.itemSelectionChanged.connect(self.show_diff)
+        layout.addWidget(self.table)
+
+        self.hint_label = QLabel("버전 하나를 고르면 직전 버전과, 두 개를 고르면 서로 비교합니다.")
+        self.hint_label.setStyleSheet("color: #aaaaaa;")
+        layout.addWidget(self.hint_label)
+
+        self.diff_view = QTextBrowser()
+        layout.addWidget(self.diff_view)
+
+        restore_btn = QPushButton("↩️ 이 버전으로 되돌리기")
+        restore_btn.clicked.connect(self.restore)
+        layout.addWidget(restore_btn)
+
+        self.contents = {}
+        self.rows = self.revisions.list(project_id)
+        self.table.setRowCount(len(self.rows))
+        for i, row in enumerate(self.rows):
+            values = [row['revision'], (row.get('created_at') or '')[:19].replace('T', ' '),
+                      row['source'], row['kind'], row['length']]
+            for j, value in enumerate(values):
+                self.table.setItem(i, j, QTableWidgetItem(str(value)))
+        if self.rows:
+            self.table.selectRow(0)
+
+    def content(self, revision):
+        """버전 본문 (한 번 복원한 버전은 재사용)"""
+        if revision not in self.contents:
+            self.contents[revision], _ = self.revisions.get(self.project_id, revision)
+        return self.contents[revision]
+
+    def selected_revisions(self):
+        """선택한 버전 번호 (오래된 순)"""
+        rows = sorted({index.row() for index in self.table.selectionModel().selectedRows()})
+        return sorted(self.rows[row]['revision'] for row in rows)
+
+    def show_diff(self):
+        """선택한 두 버전(하나면 직전 버전과)의 줄 단위 차이를 나란히 표시"""
+        selected = self.selected_revisions()
+        if not selected:
+            return
+        new = selected[-1]
+        old = selected[0] if len(selected) > 1 else new - 1
+        try:
+            new_lines = self.content(new).splitlines()
+            old_lines = self.content(old).splitlines() if old >= 1 else []
+        except Exception as e:
+            self.diff_view.setPlainText(f"버전 복원 오류: {e}")
+            return
+        table = difflib.HtmlDiff(wrapcolumn=70).make_table(
+            old_lines, new_lines, f"버전 {old}" if old >= 1 else "(없음)", f"버전 {new}", context=True)
+        self.diff_view.setHtml(
+            "<style>td { font-family: monospace; } .diff_add { background: #1f4d2b; } "
+            ".diff_chg { background: #5a4a12; } .diff_sub { background: #5c1f24; }</style>" + table)
+
+    def restore(self):
+        """선택한 (가장 최근) 버전 본문을 편집 창으로 되돌림"""
+        selected = self.selected_revisions()
+        if not selected:
+            return
+        try:
+            self.restored = self.content(selected[-1])
+        except Exception as e:
+            QMessageBox.critical(self, "오류", f"버전을 복원할 수 없습니다:\n{str(e)}")
+            return
+        self.restored_revision = selected[-1]
+        self.accept()
+
+
+class MetricsDialog(QDialog):
+    """단계별 계측 통계 패널 (백분위 지연 시간, 카운터)"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("📊 단계별 통계")
+        self.resize(820, 520)
+
+        layout = QVBoxLayout(self)
+
+        self.summary_table = QTableWidget(0, 7)
+        self.summary_table.setHorizontalHeaderLabels(["단계", "항목", "횟수", "평균", "p50", "p95", "p99"])
+        self.summary_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.summary_table)
+
+        self.counter_table = QTableWidget(0, 4)
+        self.counter_table.setHorizontalHeaderLabels(["단계", "항목", "라벨", "값"])
+        self.counter_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.counter_table.setMaximumHeight(180)
+        layout.addWidget(self.counter_table)
+
+        self.reuse_label = QLabel()
+        self.reuse_label.setStyleSheet("color: #aaaaaa;")
+        layout.addWidget(self.reuse_label)
+
+        refresh_btn = QPushButton("🔄 새로고침")
+        refresh_btn.clicked.connect(self.refresh)
+        layout.addWidget(refresh_btn)
+
+        self.refresh()
+
+    def refresh(self):
+        """최신 통계로 표 갱신"""
+        rows = metrics.summary()
+        self.summary_table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            name = row['name'] + ''.join(f" ({v})" for v in row['labels'].values())
+            values = [row['stage'], name, str(row['count']),
+                      f"{row['mean']:.1f}", f"{row['p50']:.1f}", f"{row['p95']:.1f}", f"{row['p99']:.1f}"]
+            for j, value in enumerate(values):
+                self.summary_table.setItem(i, j, QTableWidgetItem(value))
+
+        counters = metrics.counter_rows()
+        self.counter_table.setRowCount(len(counters))
+        for i, (stage, name, labels, value) in enumerate(counters):
+            label_text = ', '.join(f"{k}={v}" for k, v in labels.items())
+            for j, text in enumerate([stage, name, label_text, str(value)]):
+                self.counter_table.setItem(i, j, QTableWidgetItem(text))
+
+        rates = connection_reuse_rates()
+        self.reuse_label.setText("연결 재사용률: " + (", ".join(f"{pool} {rate:.1%}" for pool, rate in rates.items())
+                                                   if rates else "요청 없음"))
+
+
+class ContentPlannerDialog(QDialog):
+    """시드 키워드로 콘텐츠 캘린더를 계획하고 일괄 생성을 요청하는 창"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.plan = []
+        self.setWindowTitle("📅 콘텐츠 캘린더")
+        self.resize(900, 600)
+
+        layout = QVBoxLayout(self)
+
+        seeds_label = QLabel("시드 키워드 (쉼표로 구분):")
+        seeds_label.setStyleSheet("color: #aaaaaa; font-weight: bold;")
+        layout.addWidget(seeds_label)
+
+        self.seeds_input = QLineEdit()
+        self.seeds_input.setPlaceholderText("예: 보습, 수분크림, 선크림, 클렌징")
+        self.seeds_input.setText(app.keywords_input.text())
+        self.seeds_input.setStyleSheet(app.get_line_edit_style())
+        layout.addWidget(self.seeds_input)
+
+        options_layout = QHBoxLayout()
+        options_layout.addWidget(QLabel("글 수:"))
+        self.count_input = QSpinBox()
+        self.count_input.setRange(1, 500)
+        self.count_input.setValue(30)
+        options_layout.addWidget(self.count_input)
+
+        options_layout.addWidget(QLabel("하루 발행 수:"))
+        self.per_day_input = QSpinBox()
+        self.per_day_input.setRange(1, 10)
+        self.per_day_input.setValue(1)
+        options_layout.addWidget(self.per_day_input)
+
+        options_layout.addWidget(QLabel("시작일:"))
+        self.start_date_input = QDateEdit(QDate.currentDate().addDays(1))
+        self.start_date_input.setCalendarPopup(True)
+        options_layout.addWidget(self.start_date_input)
+        options_layout.addStretch()
+
+        self.plan_btn = QPushButton("🗂️ 계획 생성")
+        self.plan_btn.setStyleSheet(app.get_button_style("#4a9eff"))
+        self.plan_btn.clicked.connect(self.create_plan)
+        options_layout.addWidget(self.plan_btn)
+        layout.addLayout(options_layout)
+
+        self.plan_table = QTableWidget(0, 3)
+        self.plan_table.setHorizontalHeaderLabels(["발행일", "주제", "키워드"])
+        self.plan_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.plan_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        layout.addWidget(self.plan_table)
+
+        self.batch_btn = QPushButton("🚀 일괄 생성")
+        self.batch_btn.setStyleSheet(app.get_button_style("#00ff88"))
+        self.batch_btn.setMinimumHeight(40)
+        self.batch_btn.setEnabled(False)
+        self.batch_btn.clicked.connect(self.start_batch)
+        layout.addWidget(self.batch_btn)
+
+    def create_plan(self):
+        """계획 스레드 시작"""
+        seeds = parse_keywords(self.seeds_input.text())
+        if not seeds:
+            QMessageBox.warning(self, "입력 오류", "시드 키워드를 입력해주세요.")
+            return
+
+        self.plan_btn.setEnabled(False)
+        self.app.status_bar.showMessage("콘텐츠 캘린더 계획 중...")
+        self.plan_thread = PlanThread(
+            self.app.supabase, seeds, self.count_input.value(),
+            self.start_date_input.date().toPyDate(), self.per_day_input.value()
+        )
+        self.plan_thread.finished.connect(self.on_plan_finished)
+        self.plan_thread.error.connect(self.on_plan_error)
+        self.plan_thread.start()
+
+    def on_plan_finished(self, plan):
+        """계획 결과를 표에 표시"""
+        self.plan = plan
+        self.plan_btn.setEnabled(True)
+        self.plan_table.setRowCount(len(plan))
+        for i, item in enumerate(plan):
+            for j, key in enumerate(['date', 'topic', 'keywords']):
+                self.plan_table.setItem(i, j, QTableWidgetItem(item[key]))
+        self.batch_btn.setEnabled(bool(plan))
+        requested = self.count_input.value()
+        if len(plan) < requested:
+            self.app.status_bar.showMessage(
+                f"계획 완료: {len(plan)}개 (중복 제외로 요청 {requested}개보다 적음, 시드 키워드를 추가해보세요)")
+        else:
+            self.app.status_bar.showMessage(f"계획 완료: {len(plan)}개")
+
+    def on_plan_error(self, error):
+        """계획 오류 처리"""
+        self.plan_btn.setEnabled(True)
+        self.app.status_bar.showMessage("계획 실패")
+        QMessageBox.critical(self, "오류", f"계획 중 오류가 발생했습니다:\n{error}")
+
+    def start_batch(self):
+        """현재 분석된 레퍼런스로 일괄 생성 요청"""
+        if self.app.start_batch_generation(self.plan):
+            self.accept()
+
 
 class BlogGeneratorApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.client = None
         self.supabase = None
+        self.revisions = None
         self.current_project_id = None
+        # 저장한 프로젝트의 (주제, 키워드, 레퍼런스): 같을 때만 재생성을 같은 프로젝트 갱신으로 처리
+        self.project_key = None
         self.analysis_result = ""
+        self.validation_issues = []
+        self.analysis_usage_log = []
+        self.style_profile_id = None
+        self.corpus = ReferenceCorpus()
+        self.journal = DraftJournal()
+        self.synced_state = {}
+        self.synced_updated_at = None
+        self.sync_thread = None
         self.init_gemini_client()
         self.init_supabase_client()
         self.init_ui()
+        self.init_autosave()
 
     def init_gemini_client(self):
         """Gemini API 클라이언트 초기화"""
         api_key = os.getenv("GEMINI_API_KEY")
         if api_key:
-            self.client = genai.Client(api_key=api_key)
+            self.client = create_genai_client(api_key)
+            warm_up_connections(self.client)
         else:
             QMessageBox.warning(self, "API Key 없음",
                               ".env 파일에 GEMINI_API_KEY를 설정해주세요.")
@@ -378,6 +3278,130 @@ class BlogGeneratorApp(QMainWindow):
         key = os.getenv("SUPABASE_KEY")
         if url and key:
             self.supabase: Client = create_client(url, key)
+            self.revisions = RevisionStore(self.supabase)
+
+    def init_autosave(self):
+        """입력이 멈추면 저널에 자동 저장하고, 시작 시 이전 작업 복원"""
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setSingleShot(True)
+        self.autosave_timer.setInterval(AUTOSAVE_DELAY_MS)
+        self.autosave_timer.timeout.connect(self.autosave)
+
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setSingleShot(True)
+        self.sync_timer.setInterval(DRAFT_SYNC_DELAY_MS)
+        self.sync_timer.timeout.connect(self.sync_draft)
+
+        for widget in (self.url_input, self.reference_text, self.analysis_text, self.topic_input,
+                       self.keywords_input, self.requirements_input, self.generated_text):
+            widget.textChanged.connect(self.autosave_timer.start)
+
+        QTimer.singleShot(0, self.restore_draft)
+
+    def collect_draft_state(self):
+        """자동 저장할 현재 작업 상태"""
+        return {
+            'url': self.url_input.text(),
+            'reference_text': self.reference_text.toPlainText(),
+            'analysis_result': self.analysis_text.toPlainText(),
+            'topic': self.topic_input.text(),
+            'keywords': self.keywords_input.text(),
+            'requirements': self.requirements_input.toPlainText(),
+            'generated_content': self.generated_text.toPlainText(),
+            'project_id': self.current_project_id or '',
+            'style_profile_id': self.style_profile_id or '',
+            'project_updated_at': self.synced_updated_at or '',
+        }
+
+    def restore_draft(self):
+        """이전에 저장된 작업이 있으면 복원 여부 확인"""
+        try:
+            state = self.journal.load()
+        except (OSError, ValueError, KeyError) as e:
+            metrics.error('autosave', e)
+            logger.error("자동 저장 복원 오류: %s", e)
+            return
+        if not self.journal.has_content():
+            return
+
+        reply = QMessageBox.question(
+            self,
+            "작업 복원",
+            "이전에 작성 중이던 내용이 있습니다.\n복원하시겠습니까?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.Yes
+        )
+        if reply != QMessageBox.Yes:
+            try:
+                self.journal.backup()
+                self.journal.clear()
+            except OSError as e:
+                metrics.error('autosave', e)
+                logger.error("자동 저장 초기화 오류: %s", e)
+            return
+
+        self.url_input.setText(state.get('url', ''))
+        self.reference_text.setPlainText(state.get('reference_text', ''))
+        self.analysis_text.setPlainText(state.get('analysis_result', ''))
+        self.analysis_result = state.get('analysis_result', '')
+        self.topic_input.setText(state.get('topic', ''))
+        self.keywords_input.setText(state.get('keywords', ''))
+        self.requirements_input.setPlainText(state.get('requirements', ''))
+        self.generated_text.setPlainText(state.get('generated_content', ''))
+        self.current_project_id = state.get('project_id') or None
+        self.project_key = (state.get('topic', '').strip(), state.get('keywords', '').strip(),
+                            state.get('reference_text', '').strip()) if self.current_project_id else None
+        self.style_profile_id = state.get('style_profile_id') or None
+        self.synced_updated_at = state.get('project_updated_at') or None
+        # 위젯을 채우면서 예약된 자동 저장은 같은 내용이므로 취소
+        self.autosave_timer.stop()
+        self.synced_state = dict(state)
+        self.status_bar.showMessage("이전 작업을 복원했습니다.")
+
+    def autosave(self):
+        """변경된 필드만 저널에 기록하고, 저장된 프로젝트면 동기화 예약"""
+        try:
+            changed = self.journal.record(self.collect_draft_state())
+        except OSError as e:
+            metrics.error('autosave', e)
+            logger.error("자동 저장 오류: %s", e)
+            return
+        if self.supabase and self.current_project_id and set(changed) & set(DRAFT_SYNC_FIELDS):
+            self.sync_timer.start()
+
+    def sync_draft(self):
+        """마지막 동기화 이후 바뀐 필드를 blog_projects에 반영"""
+        if not (self.supabase and self.current_project_id):
+            return
+        if self.sync_thread and self.sync_thread.isRunning():
+            self.sync_timer.start()
+            return
+        state = self.collect_draft_state()
+        fields = {field: state[field] for field in DRAFT_SYNC_FIELDS
+                  if state[field] != self.synced_state.get(field)}
+        if not fields:
+            return
+
+        self.sync_thread = DraftSyncThread(self.supabase, self.current_project_id, fields, self.synced_updated_at,
+                                           revisions=self.revisions)
+        self.sync_thread.finished.connect(lambda row: self.on_draft_synced(state, row))
+        self.sync_thread.error.connect(lambda error: logger.warning(error))
+        self.sync_thread.start()
+
+    def on_draft_synced(self, state, row):
+        """동기화 완료 시 기준 상태와 updated_at 갱신"""
+        self.synced_state = state
+        self.synced_updated_at = row.get('updated_at')
+        # 다음 실행에서 복원해도 같은 기준으로 동기화하도록 저널에도 기록
+        self.autosave()
+        self.status_bar.showMessage("변경 내용이 자동 동기화되었습니다.")
+
+    def closeEvent(self, event):
+        """종료 전에 대기 중인 자동 저장 기록"""
+        if self.autosave_timer.isActive():
+            self.autosave_timer.stop()
+            self.autosave()
+        super().closeEvent(event)
 
     def init_ui(self):
         """UI 초기화"""
@@ -406,6 +3430,13 @@ class BlogGeneratorApp(QMainWindow):
 
         header_layout.addStretch()
 
+        stats_btn = QPushButton("📊 통계")
+        stats_btn.setStyleSheet(self.get_button_style("#6e7681"))
+        stats_btn.setMinimumHeight(40)
+        stats_btn.setMinimumWidth(100)
+        stats_btn.clicked.connect(self.show_metrics)
+        header_layout.addWidget(stats_btn)
+
         reset_btn = QPushButton("🔄 전체 초기화")
         reset_btn.setStyleSheet(self.get_button_style("#ff4444"))
         reset_btn.setMinimumHeight(40)
@@ -479,6 +3510,13 @@ class BlogGeneratorApp(QMainWindow):
 
         layout.addLayout(url_layout)
 
+        # 블로그 전체 수집 (레퍼런스 코퍼스)
+        ingest_btn = QPushButton("📚 블로그 전체 수집")
+        ingest_btn.setStyleSheet(self.get_button_style("#6e7681"))
+        ingest_btn.setMinimumHeight(35)
+        ingest_btn.clicked.connect(self.ingest_blog)
+        layout.addWidget(ingest_btn)
+
         # 또는 라벨
         or_label = QLabel("또는")
         or_label.setStyleSheet("color: #666666; text-align: center; padding: 5px;")
@@ -565,6 +3603,13 @@ class BlogGeneratorApp(QMainWindow):
         self.keywords_input.setMinimumHeight(35)
         layout.addWidget(self.keywords_input)
 
+        # 코퍼스에서 레퍼런스 자동 선택
+        auto_ref_btn = QPushButton("🔎 레퍼런스 자동 선택")
+        auto_ref_btn.setStyleSheet(self.get_button_style("#9d4eff"))
+        auto_ref_btn.setMinimumHeight(35)
+        auto_ref_btn.clicked.connect(self.auto_select_reference)
+        layout.addWidget(auto_ref_btn)
+
         # 추가 요구사항
         requirements_label = QLabel("추가 요구사항 (선택):")
         requirements_label.setStyleSheet("color: #aaaaaa; font-weight: bold;")
@@ -583,6 +3628,13 @@ class BlogGeneratorApp(QMainWindow):
         generate_btn.clicked.connect(self.generate_content)
         layout.addWidget(generate_btn)
 
+        # 콘텐츠 캘린더 (일괄 생성)
+        planner_btn = QPushButton("📅 콘텐츠 캘린더 / 일괄 생성")
+        planner_btn.setStyleSheet(self.get_button_style("#4a9eff"))
+        planner_btn.setMinimumHeight(35)
+        planner_btn.clicked.connect(self.show_content_planner)
+        layout.addWidget(planner_btn)
+
         # 생성된 글 텍스트 박스
         generated_label = QLabel("생성된 글:")
         generated_label.setStyleSheet("color: #aaaaaa; font-weight: bold;")
@@ -608,6 +3660,12 @@ class BlogGeneratorApp(QMainWindow):
         save_btn.clicked.connect(self.save_content)
         save_layout.addWidget(save_btn)
 
+        revisions_btn = QPushButton("🕘 버전 기록")
+        revisions_btn.setStyleSheet(self.get_button_style("#6e7681"))
+        revisions_btn.setMinimumHeight(35)
+        revisions_btn.clicked.connect(self.show_revisions)
+        save_layout.addWidget(revisions_btn)
+
         layout.addLayout(save_layout)
 
         panel.setLayout(layout)
@@ -735,6 +3793,20 @@ class BlogGeneratorApp(QMainWindow):
             QMessageBox.warning(self, "입력 오류", "올바른 URL 형식이 아닙니다.\n(http:// 또는 https://로 시작해야 합니다)")
             return
 
+        # 기존 레퍼런스가 있으면 추가(여러 레퍼런스 블렌딩)할지 교체할지 선택
+        self.crawl_base_text = ""
+        existing = self.reference_text.toPlainText().strip()
+        if existing:
+            reply = QMessageBox.question(
+                self,
+                "레퍼런스 추가",
+                "기존 레퍼런스에 이어서 추가하시겠습니까?\n(아니오를 누르면 기존 내용을 교체합니다)",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.Yes
+            )
+            if reply == QMessageBox.Yes:
+                self.crawl_base_text = existing
+
         self.status_bar.showMessage("URL 크롤링 중...")
         self.reference_text.setPlainText("크롤링 중입니다. 잠시만 기다려주세요...")
 
@@ -746,31 +3818,116 @@ class BlogGeneratorApp(QMainWindow):
 
     def on_crawl_finished(self, content):
         """크롤링 완료 처리"""
-        self.reference_text.setPlainText(content)
+        self.reference_text.setPlainText(join_references([self.crawl_base_text, content]))
+        self.add_to_corpus(self.crawl_thread.url, content, "crawl")
         self.status_bar.showMessage("크롤링 완료!")
         QMessageBox.information(self, "완료", "블로그 글을 성공적으로 가져왔습니다!")
 
     def on_crawl_error(self, error):
         """크롤링 오류 처리"""
-        self.reference_text.setPlainText("")
+        self.reference_text.setPlainText(self.crawl_base_text)
         self.status_bar.showMessage("크롤링 실패")
         QMessageBox.critical(self, "오류", f"크롤링 중 오류가 발생했습니다:\n{error}\n\n직접 복사해서 붙여넣어 주세요.")
 
+    def ingest_blog(self):
+        """블로그 전체를 레퍼런스 코퍼스로 증분 수집"""
+        target, ok = QInputDialog.getText(
+            self,
+            "블로그 전체 수집",
+            "네이버 블로그 ID 또는 티스토리 주소를 입력하세요\n(예: myblog, myblog.tistory.com)"
+        )
+        if not ok or not target.strip():
+            return
+
+        self.status_bar.showMessage("블로그 글 목록 확인 중...")
+        self.ingest_thread = BlogIngestThread(target, corpus=self.corpus)
+        self.ingest_thread.progress.connect(self.status_bar.showMessage)
+        self.ingest_thread.finished.connect(self.on_ingest_finished)
+        self.ingest_thread.error.connect(self.on_ingest_error)
+        self.ingest_thread.start()
+
+    def on_ingest_finished(self, summary):
+        """블로그 수집 완료 처리"""
+        message = (f"{summary['blog']}: 글 {summary['listed']}개 확인, 새로 수집 {summary['fetched']}개, "
+                   f"변경 없음 {summary['skipped']}개, 실패 {summary['failed']}개")
+        self.status_bar.showMessage(f"블로그 수집 완료 - {message}")
+        QMessageBox.information(self, "완료", message)
+
+    def on_ingest_error(self, error):
+        """블로그 수집 오류 처리"""
+        self.status_bar.showMessage("블로그 수집 실패")
+        QMessageBox.critical(self, "오류", error)
+
+    def add_to_corpus(self, url, content, source):
+        """불러온 레퍼런스를 로컬 코퍼스에도 보관 (자동 선택 후보)"""
+        try:
+            self.corpus.add(url, content, split_title(content)[0], source=source)
+            self.corpus.save()
+        except OSError as e:
+            metrics.error('ingest', e)
+            logger.error("코퍼스 저장 오류: %s", e)
+
+    def auto_select_reference(self):
+        """주제/키워드에 가장 잘 맞는 레퍼런스를 코퍼스에서 찾아 분석"""
+        if not self.client:
+            QMessageBox.warning(self, "API Key 없음", "GEMINI_API_KEY를 설정해주세요.")
+            return
+
+        topic = self.topic_input.text().strip()
+        if not topic:
+            QMessageBox.warning(self, "입력 오류", "주제를 입력해주세요.")
+            return
+
+        if not self.corpus.documents:
+            QMessageBox.warning(self, "코퍼스 없음", "먼저 블로그 전체 수집이나 URL 크롤링으로 레퍼런스를 모아주세요.")
+            return
+
+        self.status_bar.showMessage("적합한 레퍼런스 검색 중...")
+        self.retrieve_thread = RetrieveThread(self.client, self.corpus, topic, self.keywords_input.text())
+        self.retrieve_thread.finished.connect(self.on_retrieve_finished)
+        self.retrieve_thread.error.connect(self.on_retrieve_error)
+        self.retrieve_thread.start()
+
+    def on_retrieve_finished(self, hits):
+        """검색된 최적 레퍼런스를 불러오고 분석 (캐시에 있으면 바로 사용)"""
+        if not hits:
+            self.status_bar.showMessage("적합한 레퍼런스를 찾지 못했습니다.")
+            return
+
+        url, title, score = hits[0]
+        self.reference_text.setPlainText(self.corpus.read(url))
+        self.url_input.setText(url if url.startswith('http') else "")
+        candidates = '\n'.join(f"{i + 1}. {t or u} ({s:.2f})" for i, (u, t, s) in enumerate(hits))
+        self.reference_text.setToolTip(f"자동 선택 후보:\n{candidates}")
+        self.status_bar.showMessage(f"레퍼런스 자동 선택: {title or url} (유사도 {score:.2f})")
+        self.analyze_reference()
+
+    def on_retrieve_error(self, error):
+        """레퍼런스 검색 오류 처리"""
+        self.status_bar.showMessage("레퍼런스 검색 실패")
+        QMessageBox.critical(self, "오류", f"레퍼런스 검색 중 오류가 발생했습니다:\n{error}")
+
     def load_reference_file(self):
         """레퍼런스 파일 불러오기"""
-        file_path, _ = QFileDialog.getOpenFileName(
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self,
-            "레퍼런스 파일 선택",
+            "레퍼런스 파일 선택 (여러 개 선택 가능)",
             "",
             "Text Files (*.txt *.md);;All Files (*)"
         )
 
-        if file_path:
+        if file_paths:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    self.reference_text.setPlainText(content)
-                    self.status_bar.showMessage(f"파일 로드 완료: {file_path}")
+                contents = []
+                for file_path in file_paths:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        contents.append(f.read())
+                    self.add_to_corpus(f"file://{os.path.abspath(file_path)}", contents[-1], "file")
+                self.reference_text.setPlainText(join_references(contents))
+                if len(file_paths) == 1:
+                    self.status_bar.showMessage(f"파일 로드 완료: {file_paths[0]}")
+                else:
+                    self.status_bar.showMessage(f"레퍼런스 {len(file_paths)}개 로드 완료")
             except Exception as e:
                 QMessageBox.critical(self, "오류", f"파일을 불러올 수 없습니다:\n{str(e)}")
 
@@ -787,16 +3944,28 @@ class BlogGeneratorApp(QMainWindow):
 
         self.status_bar.showMessage("구조 분석 중...")
         self.analysis_text.setPlainText("분석 중입니다. 잠시만 기다려주세요...")
-
-        # 분석 스레드 시작
-        self.analyze_thread = AnalyzeThread(self.client, reference)
+        self.style_profile_id = None
+
+        # 분석 스레드 시작 (레퍼런스가 여러 개면 병렬 분석 후 스타일 프로필로 병합)
+        references = split_references(reference)
+        if len(references) > 1:
+            self.analyze_thread = MultiAnalyzeThread(self.client, self.supabase, references)
+            self.analyze_thread.progress.connect(self.status_bar.showMessage)
+            self.analyze_thread.profile_saved.connect(self.on_style_profile_saved)
+        else:
+            self.analyze_thread = AnalyzeThread(self.client, reference)
         self.analyze_thread.finished.connect(self.on_analysis_finished)
         self.analyze_thread.error.connect(self.on_analysis_error)
         self.analyze_thread.start()
 
+    def on_style_profile_saved(self, profile_id):
+        """병합된 스타일 프로필 ID 저장 (프로젝트 저장 시 연결)"""
+        self.style_profile_id = profile_id
+
     def on_analysis_finished(self, result):
         """분석 완료 처리"""
         self.analysis_result = result
+        self.analysis_usage_log = self.analyze_thread.usage_log
         self.analysis_text.setPlainText(result)
         self.status_bar.showMessage("분석 완료!")
 
@@ -840,17 +4009,69 @@ class BlogGeneratorApp(QMainWindow):
         )
         self.generate_thread.finished.connect(self.on_generation_finished)
         self.generate_thread.error.connect(self.on_generation_error)
+        self.generate_thread.progress.connect(self.status_bar.showMessage)
+        self.generate_thread.validated.connect(self.on_generation_validated)
         self.generate_thread.start()
 
     def on_generation_finished(self, result):
         """글 생성 완료 처리"""
         self.generated_text.setPlainText(result)
-        self.status_bar.showMessage("글 생성 완료!")
+        issues = self.validation_issues
+        if issues:
+            self.status_bar.showMessage(f"글 생성 완료! (검증 경고 {len(issues)}건: {issues[0]})")
+        else:
+            self.status_bar.showMessage("글 생성 완료! (구조 검증 통과)")
 
         # Supabase에 저장
         if self.supabase:
             self.save_to_supabase(result)
 
+    def show_content_planner(self):
+        """콘텐츠 캘린더 창 표시"""
+        dialog = ContentPlannerDialog(self)
+        dialog.exec_()
+
+    def start_batch_generation(self, plan):
+        """계획된 글들을 현재 분석 결과로 일괄 생성 (시작하면 True)"""
+        if not self.client:
+            QMessageBox.warning(self, "API Key 없음", "GEMINI_API_KEY를 설정해주세요.")
+            return False
+
+        reference = self.reference_text.toPlainText().strip()
+        if not reference or not self.analysis_result:
+            QMessageBox.warning(self, "분석 필요", "먼저 레퍼런스 글을 분석해주세요.")
+            return False
+
+        url = self.url_input.text().strip()
+        self.status_bar.showMessage(f"일괄 생성 시작: {len(plan)}개")
+        self.batch_thread = BatchGenerateThread(
+            self.client, self.supabase, reference, self.analysis_result, plan,
+            reference_url=url if url else None, style_profile_id=self.style_profile_id
+        )
+        self.batch_thread.progress.connect(self.status_bar.showMessage)
+        self.batch_thread.finished.connect(self.on_batch_finished)
+        self.batch_thread.error.connect(self.on_batch_error)
+        self.batch_thread.start()
+        return True
+
+    def on_batch_finished(self, results):
+        """일괄 생성 완료 처리"""
+        self.status_bar.showMessage(f"일괄 생성 완료: {len(results)}개")
+        QMessageBox.information(self, "완료", f"{len(results)}개의 글을 생성했습니다.")
+
+    def on_batch_error(self, error):
+        """일괄 생성 오류 처리"""
+        self.status_bar.showMessage("일괄 생성 실패")
+        QMessageBox.critical(self, "오류", f"일괄 생성 중 오류가 발생했습니다:\n{error}")
+
+    def on_generation_validated(self, issues):
+        """초안 검증 결과 처리 (재생성 후에도 남은 문제 표시)"""
+        self.validation_issues = issues
+        if issues:
+            self.generated_text.setToolTip("검증 경고:\n" + '\n'.join(issues))
+        else:
+            self.generated_text.setToolTip("")
+
     def on_generation_error(self, error):
         """글 생성 오류 처리"""
         self.generated_text.setPlainText("")
@@ -925,14 +4146,49 @@ class BlogGeneratorApp(QMainWindow):
                 "generated_content": generated_content,
                 "status": "completed"
             }
-
-            response = self.supabase.table("blog_projects").insert(data).execute()
-
-            if response.data:
-                self.current_project_id = response.data[0]['id']
-                print(f"프로젝트 저장 완료: {self.current_project_id}")
+            if self.style_profile_id:
+                data["style_profile_id"] = self.style_profile_id
+
+            usage_log = self.analysis_usage_log + self.generate_thread.usage_log
+            project_key = (topic, keywords, reference)
+            row = None
+            if self.current_project_id and self.synced_updated_at and project_key == self.project_key:
+                # 주제/키워드/레퍼런스가 같은 재생성은 새 행 대신 기존 행을 갱신하고 버전만 추가
+                row = update_project(self.supabase, self.current_project_id, data,
+                                     self.synced_updated_at, usage_log=usage_log)
+                if row is None:
+                    logger.warning("다른 곳에서 먼저 수정된 프로젝트라 새 프로젝트로 저장합니다.")
+                source = 'regenerate'
+            if row is None:
+                row = insert_project(self.supabase, data, usage_log=usage_log)
+                source = 'generate'
+            project_id = row['id'] if row else None
+            if project_id:
+                self.current_project_id = project_id
+                self.project_key = project_key
+                # 첫 자동 동기화부터 updated_at 조건으로 갱신하도록 저장 응답의 값을 기준으로 삼음
+                self.synced_updated_at = row.get('updated_at')
+                self.synced_state = self.collect_draft_state()
+                self.autosave()
+                logger.info("프로젝트 저장 완료: %s", self.current_project_id)
+                try:
+                    revision = self.revisions.append(project_id, generated_content, source)
+                    logger.info("버전 기록: %s", revision)
+                except Exception as e:
+                    logger.error("버전 기록 오류: %s", e)
         except Exception as e:
-            print(f"Supabase 저장 오류: {e}")
+            metrics.error('supabase', e)
+            logger.error("Supabase 저장 오류: %s", e)
+
+    def show_revisions(self):
+        """현재 프로젝트의 버전 기록 창 표시"""
+        if not (self.revisions and self.current_project_id):
+            QMessageBox.warning(self, "버전 기록 없음", "Supabase에 저장된 프로젝트가 있어야 버전 기록을 볼 수 있습니다.")
+            return
+        dialog = RevisionDialog(self.revisions, self.current_project_id, self)
+        if dialog.exec_() == QDialog.Accepted and dialog.restored is not None:
+            self.generated_text.setPlainText(dialog.restored)
+            self.status_bar.showMessage(f"버전 {dialog.restored_revision}(으)로 되돌렸습니다.")
 
     def load_project_history(self):
         """저장된 프로젝트 히스토리 불러오기"""
@@ -945,9 +4201,14 @@ class BlogGeneratorApp(QMainWindow):
 
             return response.data
         except Exception as e:
-            print(f"히스토리 로드 오류: {e}")
+            logger.warning("히스토리 로드 오류: %s", e)
             return []
 
+    def show_metrics(self):
+        """단계별 통계 패널 표시"""
+        dialog = MetricsDialog(self)
+        dialog.exec_()
+
     def reset_all(self):
         """모든 필드 초기화"""
         reply = QMessageBox.question(
@@ -959,6 +4220,15 @@ class BlogGeneratorApp(QMainWindow):
         )
 
         if reply == QMessageBox.Yes:
+            # 초기화 전 상태를 백업해 둠 (drafts/backup-*.json)
+            self.autosave_timer.stop()
+            self.autosave()
+            try:
+                self.journal.backup()
+            except OSError as e:
+                metrics.error('autosave', e)
+                logger.error("자동 저장 백업 오류: %s", e)
+
             # URL 입력 초기화
             self.url_input.clear()
 
@@ -968,6 +4238,7 @@ class BlogGeneratorApp(QMainWindow):
             # 분석 결과 초기화
             self.analysis_text.clear()
             self.analysis_result = ""
+            self.analysis_usage_log = []
 
             # 주제, 키워드, 요구사항 초기화
             self.topic_input.clear()
@@ -979,6 +4250,19 @@ class BlogGeneratorApp(QMainWindow):
 
             # 프로젝트 ID 초기화
             self.current_project_id = None
+            self.project_key = None
+            self.style_profile_id = None
+
+            # 자동 저장 상태 초기화
+            self.autosave_timer.stop()
+            self.sync_timer.stop()
+            try:
+                self.journal.clear()
+            except OSError as e:
+                metrics.error('autosave', e)
+                logger.error("자동 저장 초기화 오류: %s", e)
+            self.synced_state = {}
+            self.synced_updated_at = None
 
             # 상태바 메시지
             self.status_bar.showMessage("모든 내용이 초기화되었습니다.")
@@ -986,10 +4270,211 @@ class BlogGeneratorApp(QMainWindow):
             QMessageBox.information(self, "초기화 완료", "모든 내용이 초기화되었습니다.")
 
 
+def run_thread_sync(thread):
+    """QThread의 run()을 현재 스레드에서 실행하고 finished 결과를 반환 (헤드리스용)"""
+    result = {}
+    thread.finished.connect(lambda value: result.setdefault('value', value))
+    thread.error.connect(lambda message: result.setdefault('error', message))
+    thread.run()
+    if 'error' in result:
+        raise RuntimeError(result['error'])
+    return result.get('value')
+
+
+def run_ingest(args):
+    """GUI 없이 블로그 전체 수집 실행 (주기 실행용)"""
+    QCoreApplication(sys.argv)
+    try:
+        thread = BlogIngestThread(args.ingest_blog)
+        thread.progress.connect(print)
+        summary = run_thread_sync(thread)
+    except Exception as e:
+        print(e)
+        return 1
+    print(f"{summary['blog']}: 글 {summary['listed']}개 확인, 새로 수집 {summary['fetched']}개, "
+          f"변경 없음 {summary['skipped']}개, 실패 {summary['failed']}개")
+    return 0
+
+
+def run_crawl_list(args):
+    """GUI 없이 URL 목록을 크롤링 프로세스 풀로 가져와 레퍼런스 코퍼스에 추가 (대량 가져오기용)"""
+    with open(args.crawl_list, 'r', encoding='utf-8') as f:
+        urls = list(dict.fromkeys(line.strip() for line in f if line.strip() and not line.startswith('#')))
+    corpus = ReferenceCorpus()
+    workers = args.crawl_workers or CRAWL_WORKERS
+    fetched = failed = 0
+    start = time.perf_counter()
+    try:
+        with CrawlPool(workers=min(workers, len(urls) or 1)) as pool:
+            for url, content, error in pool.crawl(urls):
+                if content:
+                    fetched += 1
+                    corpus.add(url, content, source="crawl")
+                else:
+                    failed += 1
+                    print(f"크롤링 실패 ({url}): {error}")
+                if (fetched + failed) % 50 == 0:
+                    corpus.save()
+                    print(f"크롤링 중... {fetched + failed}/{len(urls)}")
+    except Exception as e:
+        print(f"크롤링 오류: {e}")
+        return 1
+    finally:
+        corpus.save()
+    elapsed = time.perf_counter() - start
+    print(f"크롤링 완료: 성공 {fetched}개, 실패 {failed}개, {elapsed:.1f}초 "
+          f"({len(urls) / elapsed if elapsed else 0:.2f}페이지/초, 워커 {workers}개)")
+    return 0 if not failed else 1
+
+
+def run_transfer(args):
+    """GUI 없이 blog_projects 대량 내보내기/가져오기 실행"""
+    url, key = os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY")
+    if not (url and key):
+        print(".env 파일에 SUPABASE_URL과 SUPABASE_KEY를 설정해주세요.")
+        return 1
+    supabase = create_client(url, key)
+
+    try:
+        if args.export_path:
+            result = export_projects(supabase, args.export_path)
+            print(f"내보내기 완료: {result['rows']}행, {result['bytes'] / 1024:.1f}KB, "
+                  f"{result['seconds']:.1f}초 ({result['rows_per_s']:.0f}행/초)")
+        else:
+            result = import_projects(supabase, args.import_path)
+            print(f"가져오기 완료: {result['rows']}행, {result['seconds']:.1f}초 "
+                  f"({result['rows_per_s']:.0f}행/초)")
+    except Exception as e:
+        print(f"{'내보내기' if args.export_path else '가져오기'} 오류: {e}")
+        return 1
+    return 0
+
+
+def run_headless(args):
+    """GUI 없이 크롤링 → 분석 → 생성 파이프라인 실행"""
+    QCoreApplication(sys.argv)
+
+    if args.metrics_port:
+        serve_metrics(args.metrics_port, args.metrics_host)
+        print(f"메트릭 노출: http://{args.metrics_host}:{args.metrics_port}/metrics")
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        print(".env 파일에 GEMINI_API_KEY를 설정해주세요.")
+        return 1
+    client = create_genai_client(api_key)
+    # 크롤링하는 동안 Gemini 연결을 미리 열어 둠
+    warm_up_connections(client)
+    supabase_url, supabase_key = os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY")
+    supabase = create_client(supabase_url, supabase_key) if supabase_url and supabase_key else None
+
+    try:
+        if args.url:
+            reference = run_thread_sync(CrawlThread(args.url))
+        else:
+            with open(args.reference_file, 'r', encoding='utf-8') as f:
+                reference = f.read()
+
+        references = split_references(reference)
+        profile = {}
+        if len(references) > 1:
+            analysis_thread = MultiAnalyzeThread(client, supabase, references)
+            analysis_thread.profile_saved.connect(lambda profile_id: profile.setdefault('id', profile_id))
+        else:
+            analysis_thread = AnalyzeThread(client, reference)
+        analysis_result = run_thread_sync(analysis_thread)
+        generate_thread = GenerateThread(
+            client, reference, analysis_result,
+            args.topic, args.keywords, args.requirements
+        )
+        generated = run_thread_sync(generate_thread)
+    except Exception as e:
+        print(f"파이프라인 오류: {e}")
+        return 1
+    finally:
+        if args.metrics_file:
+            with open(args.metrics_file, 'w', encoding='utf-8') as f:
+                f.write(metrics.to_prometheus())
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(generated)
+        print(f"저장 완료: {args.output}")
+    else:
+        print(generated)
+
+    if supabase:
+        try:
+            data = {
+                "reference_text": reference,
+                "reference_url": args.url,
+                "analysis_result": analysis_result,
+                "topic": args.topic,
+                "keywords": args.keywords,
+                "requirements": args.requirements or None,
+                "generated_content": generated,
+                "status": "completed"
+            }
+            if profile.get('id'):
+                data["style_profile_id"] = profile['id']
+            row = insert_project(supabase, data, usage_log=analysis_thread.usage_log + generate_thread.usage_log)
+            project_id = row['id'] if row else None
+            print(f"프로젝트 저장 완료: {project_id}")
+            if project_id:
+                RevisionStore(supabase).append(project_id, generated, 'generate')
+        except Exception as e:
+            print(f"Supabase 저장 오류: {e}")
+    return 0
+
+
+def parse_args(argv):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="브랜드 블로그 자동 생성 도구")
+    parser.add_argument('--headless', action='store_true', help="GUI 없이 파이프라인 실행")
+    parser.add_argument('--url', help="레퍼런스 블로그 URL")
+    parser.add_argument('--reference-file', help="레퍼런스 글 파일 (.txt, .md)")
+    parser.add_argument('--topic', help="작성할 글의 주제")
+    parser.add_argument('--keywords', default="", help="타겟 키워드 (쉼표로 구분)")
+    parser.add_argument('--requirements', default="", help="추가 요구사항")
+    parser.add_argument('--output', help="생성된 글을 저장할 파일")
+    parser.add_argument('--metrics-port', type=int, help="Prometheus 메트릭 노출 포트 (/metrics)")
+    parser.add_argument('--metrics-host', default=METRICS_BIND_HOST,
+                        help="메트릭 서버 바인드 주소 (기본 127.0.0.1, BRANDBLOG_METRICS_HOST로도 지정)")
+    parser.add_argument('--metrics-file', help="종료 시 Prometheus 형식 메트릭을 저장할 파일")
+    parser.add_argument('--ingest-blog', help="블로그 전체 증분 수집 (네이버 블로그 ID 또는 티스토리 주소)")
+    parser.add_argument('--export', dest='export_path',
+                        help="blog_projects를 JSONL로 내보낼 파일 (.jsonl, .jsonl.gz, .jsonl.zst)")
+    parser.add_argument('--import', dest='import_path',
+                        help="JSONL 파일에서 blog_projects로 가져오기 (.jsonl, .jsonl.gz, .jsonl.zst)")
+    parser.add_argument('--crawl-list', help="URL 목록 파일(한 줄에 하나)을 크롤링해 레퍼런스 코퍼스에 추가")
+    parser.add_argument('--crawl-workers', type=int, help="크롤링 워커 프로세스 수 (기본: CRAWL_WORKERS 또는 CPU 수)")
+    args, _ = parser.parse_known_args(argv)
+
+    if args.headless and not args.topic:
+        parser.error("--headless 모드에는 --topic이 필요합니다.")
+    if args.headless and not (args.url or args.reference_file):
+        parser.error("--headless 모드에는 --url 또는 --reference-file이 필요합니다.")
+    return args
+
+
 def main():
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    args = parse_args(sys.argv[1:])
+    if args.ingest_blog:
+        sys.exit(run_ingest(args))
+    if args.export_path or args.import_path:
+        sys.exit(run_transfer(args))
+    if args.crawl_list:
+        sys.exit(run_crawl_list(args))
+    if args.headless:
+        sys.exit(run_headless(args))
+
     app = QApplication(sys.argv)
     app.setStyle('Fusion')  # Fusion 스타일 사용
 
+    if args.metrics_port:
+        serve_metrics(args.metrics_port, args.metrics_host)
+
     window = BlogGeneratorApp()
     window.show()
 
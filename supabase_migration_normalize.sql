@@ -0,0 +1,206 @@
+-- 기존 blog_projects 데이터를 정규화 스키마로 옮기는 마이그레이션
+-- (supabase_schema.sql을 처음 적용한 새 프로젝트는 실행할 필요 없음)
+--
+-- 여러 번 실행해도 안전합니다. 본문 해시는 앱과 같은 SHA-256(UTF-8) hex 값입니다.
+-- 실행 후 실제 디스크 공간을 돌려받으려면 별도로 `VACUUM FULL blog_projects;`를 실행하세요.
+
+BEGIN;
+
+-- 1. 새 테이블 (style_profiles는 다중 레퍼런스 기능에서 추가된 테이블)
+CREATE TABLE IF NOT EXISTS style_profiles (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+    profile_hash TEXT NOT NULL UNIQUE,
+    reference_hashes TEXT[] NOT NULL,
+    reference_count INTEGER NOT NULL,
+    metrics JSONB,
+    profile TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS blog_references (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE,
+    reference_url TEXT,
+    reference_text TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS blog_analyses (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+    reference_id UUID NOT NULL REFERENCES blog_references(id) ON DELETE CASCADE,
+    model TEXT NOT NULL DEFAULT 'gemini-2.5-flash',
+    analysis_hash TEXT NOT NULL,
+    analysis_result TEXT NOT NULL,
+    UNIQUE (reference_id, analysis_hash)
+);
+
+CREATE TABLE IF NOT EXISTS keywords (
+    id BIGSERIAL PRIMARY KEY,
+    keyword TEXT NOT NULL UNIQUE,
+    label TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS project_keywords (
+    project_id UUID NOT NULL REFERENCES blog_projects(id) ON DELETE CASCADE,
+    keyword_id BIGINT NOT NULL REFERENCES keywords(id) ON DELETE CASCADE,
+    position SMALLINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (project_id, keyword_id)
+);
+
+CREATE TABLE IF NOT EXISTS generation_metrics (
+    id BIGSERIAL PRIMARY KEY,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+    project_id UUID NOT NULL REFERENCES blog_projects(id) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    model TEXT NOT NULL,
+    latency_ms INTEGER,
+    ttft_ms INTEGER,
+    prompt_tokens INTEGER,
+    output_tokens INTEGER
+);
+
+-- 모델 라우팅 기록 (선택 사유, 할당량 오류로 대체된 원래 모델, 추정 비용)
+ALTER TABLE generation_metrics ADD COLUMN IF NOT EXISTS route_reason TEXT;
+ALTER TABLE generation_metrics ADD COLUMN IF NOT EXISTS fallback_from TEXT;
+ALTER TABLE generation_metrics ADD COLUMN IF NOT EXISTS cost_usd NUMERIC(12, 6);
+
+-- 프로젝트별 본문 버전 기록 (전체 본문 또는 직전 버전 대비 줄 단위 변경분)
+CREATE TABLE IF NOT EXISTS blog_revisions (
+    id BIGSERIAL PRIMARY KEY,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+    project_id UUID NOT NULL REFERENCES blog_projects(id) ON DELETE CASCADE,
+    revision INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    kind TEXT NOT NULL CHECK (kind IN ('full', 'delta')),
+    content TEXT,
+    delta JSONB,
+    content_hash TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    UNIQUE (project_id, revision)
+);
+
+-- 2. blog_projects 참조 컬럼
+ALTER TABLE blog_projects ADD COLUMN IF NOT EXISTS reference_id UUID REFERENCES blog_references(id) ON DELETE SET NULL;
+ALTER TABLE blog_projects ADD COLUMN IF NOT EXISTS analysis_id UUID REFERENCES blog_analyses(id) ON DELETE SET NULL;
+ALTER TABLE blog_projects ADD COLUMN IF NOT EXISTS style_profile_id UUID REFERENCES style_profiles(id) ON DELETE SET NULL;
+ALTER TABLE blog_projects ALTER COLUMN reference_text DROP NOT NULL;
+
+-- 3. 인덱스
+CREATE INDEX IF NOT EXISTS idx_blog_projects_reference_id ON blog_projects(reference_id);
+CREATE INDEX IF NOT EXISTS idx_blog_projects_analysis_id ON blog_projects(analysis_id);
+CREATE INDEX IF NOT EXISTS idx_blog_projects_tags ON blog_projects USING gin(tags);
+CREATE INDEX IF NOT EXISTS idx_blog_analyses_reference_id ON blog_analyses(reference_id);
+CREATE INDEX IF NOT EXISTS idx_project_keywords_keyword_id ON project_keywords(keyword_id);
+CREATE INDEX IF NOT EXISTS idx_generation_metrics_project_id ON generation_metrics(project_id);
+CREATE INDEX IF NOT EXISTS idx_generation_metrics_model_created_at ON generation_metrics(model, created_at DESC);
+
+-- 4. 레퍼런스 중복 제거
+INSERT INTO blog_references (content_hash, reference_url, reference_text)
+SELECT DISTINCT ON (content_hash) content_hash, reference_url, reference_text
+FROM (
+    SELECT encode(sha256(convert_to(reference_text, 'UTF8')), 'hex') AS content_hash,
+           reference_url, reference_text, created_at
+    FROM blog_projects
+    WHERE reference_id IS NULL AND reference_text IS NOT NULL
+) s
+ORDER BY content_hash, created_at
+ON CONFLICT (content_hash) DO NOTHING;
+
+UPDATE blog_projects p
+SET reference_id = r.id
+FROM blog_references r
+WHERE p.reference_id IS NULL
+  AND p.reference_text IS NOT NULL
+  AND r.content_hash = encode(sha256(convert_to(p.reference_text, 'UTF8')), 'hex');
+
+-- 5. 분석 결과 중복 제거
+INSERT INTO blog_analyses (reference_id, analysis_hash, analysis_result)
+SELECT DISTINCT ON (reference_id, analysis_hash) reference_id, analysis_hash, analysis_result
+FROM (
+    SELECT reference_id,
+           encode(sha256(convert_to(analysis_result, 'UTF8')), 'hex') AS analysis_hash,
+           analysis_result
+    FROM blog_projects
+    WHERE analysis_id IS NULL AND reference_id IS NOT NULL AND analysis_result IS NOT NULL
+) s
+ON CONFLICT (reference_id, analysis_hash) DO NOTHING;
+
+UPDATE blog_projects p
+SET analysis_id = a.id
+FROM blog_analyses a
+WHERE p.analysis_id IS NULL
+  AND p.analysis_result IS NOT NULL
+  AND a.reference_id = p.reference_id
+  AND a.analysis_hash = encode(sha256(convert_to(p.analysis_result, 'UTF8')), 'hex');
+
+-- 6. 쉼표 구분 키워드 → keywords / project_keywords
+INSERT INTO keywords (keyword, label)
+SELECT DISTINCT ON (keyword) keyword, label
+FROM (
+    SELECT lower(regexp_replace(k, '\s+', '', 'g')) AS keyword, btrim(k) AS label, p.created_at
+    FROM blog_projects p
+    CROSS JOIN LATERAL regexp_split_to_table(p.keywords, ',') AS k
+    WHERE p.keywords IS NOT NULL
+) s
+WHERE keyword <> ''
+ORDER BY keyword, created_at
+ON CONFLICT (keyword) DO NOTHING;
+
+INSERT INTO project_keywords (project_id, keyword_id, position)
+SELECT p.id, kw.id, min(t.ord) - 1
+FROM blog_projects p
+CROSS JOIN LATERAL regexp_split_to_table(p.keywords, ',') WITH ORDINALITY AS t(k, ord)
+JOIN keywords kw ON kw.keyword = lower(regexp_replace(t.k, '\s+', '', 'g'))
+WHERE p.keywords IS NOT NULL
+GROUP BY p.id, kw.id
+ON CONFLICT (project_id, keyword_id) DO NOTHING;
+
+-- 기존 생성 본문은 1번 버전(전체 본문)으로 기록
+INSERT INTO blog_revisions (created_at, project_id, revision, source, kind, content, content_hash, length)
+SELECT p.created_at, p.id, 1, 'generate', 'full', p.generated_content,
+       encode(sha256(convert_to(p.generated_content, 'UTF8')), 'hex'), char_length(p.generated_content)
+FROM blog_projects p
+WHERE p.generated_content IS NOT NULL
+ON CONFLICT (project_id, revision) DO NOTHING;
+
+-- 7. 옮긴 본문은 blog_projects에서 비움 (중복 저장 제거)
+UPDATE blog_projects SET reference_text = NULL WHERE reference_id IS NOT NULL AND reference_text IS NOT NULL;
+UPDATE blog_projects SET analysis_result = NULL WHERE analysis_id IS NOT NULL AND analysis_result IS NOT NULL;
+
+-- 8. 조회용 뷰
+CREATE OR REPLACE VIEW blog_projects_full WITH (security_invoker = true) AS
+SELECT
+    p.id, p.created_at, p.updated_at,
+    COALESCE(p.reference_url, r.reference_url) AS reference_url,
+    COALESCE(p.reference_text, r.reference_text) AS reference_text,
+    COALESCE(p.analysis_result, a.analysis_result) AS analysis_result,
+    p.topic, p.keywords, p.requirements, p.generated_content,
+    p.status, p.tags, p.style_profile_id, p.reference_id, p.analysis_id
+FROM blog_projects p
+LEFT JOIN blog_references r ON r.id = p.reference_id
+LEFT JOIN blog_analyses a ON a.id = p.analysis_id;
+
+-- 9. RLS (blog_projects와 같은 정책)
+ALTER TABLE blog_references ENABLE ROW LEVEL SECURITY;
+ALTER TABLE blog_analyses ENABLE ROW LEVEL SECURITY;
+ALTER TABLE keywords ENABLE ROW LEVEL SECURITY;
+ALTER TABLE project_keywords ENABLE ROW LEVEL SECURITY;
+ALTER TABLE generation_metrics ENABLE ROW LEVEL SECURITY;
+ALTER TABLE blog_revisions ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Enable all access for all users" ON blog_references;
+DROP POLICY IF EXISTS "Enable all access for all users" ON blog_analyses;
+DROP POLICY IF EXISTS "Enable all access for all users" ON keywords;
+DROP POLICY IF EXISTS "Enable all access for all users" ON project_keywords;
+DROP POLICY IF EXISTS "Enable all access for all users" ON generation_metrics;
+DROP POLICY IF EXISTS "Enable all access for all users" ON blog_revisions;
+
+CREATE POLICY "Enable all access for all users" ON blog_references FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Enable all access for all users" ON blog_analyses FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Enable all access for all users" ON keywords FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Enable all access for all users" ON project_keywords FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Enable all access for all users" ON generation_metrics FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Enable all access for all users" ON blog_revisions FOR ALL USING (true) WITH CHECK (true);
+
+COMMIT;
@@ -1,15 +1,53 @@
+-- 여러 레퍼런스를 병합한 스타일 프로필 (같은 레퍼런스 조합은 한 번만 계산)
+CREATE TABLE IF NOT EXISTS style_profiles (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+
+    -- 레퍼런스별 SHA-256 해시를 정렬해 이은 값의 해시
+    profile_hash TEXT NOT NULL UNIQUE,
+    reference_hashes TEXT[] NOT NULL,
+    reference_count INTEGER NOT NULL,
+
+    -- 평균 구조 지표 (본문 길이, 섹션 수, 섹션 길이, 문단 수)
+    metrics JSONB,
+    -- 합의 스타일 프로필 (분석 결과와 같은 형식)
+    profile TEXT NOT NULL
+);
+
+-- 레퍼런스 원문 (내용 SHA-256 해시로 중복 제거, 여러 프로젝트가 공유)
+CREATE TABLE IF NOT EXISTS blog_references (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE,
+    reference_url TEXT,
+    reference_text TEXT NOT NULL
+);
+
+-- 레퍼런스 분석 결과 (레퍼런스 + 분석 내용 해시로 중복 제거)
+CREATE TABLE IF NOT EXISTS blog_analyses (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+    reference_id UUID NOT NULL REFERENCES blog_references(id) ON DELETE CASCADE,
+    model TEXT NOT NULL DEFAULT 'gemini-2.5-flash',
+    analysis_hash TEXT NOT NULL,
+    analysis_result TEXT NOT NULL,
+    UNIQUE (reference_id, analysis_hash)
+);
+
 -- 블로그 생성 프로젝트 테이블
 CREATE TABLE IF NOT EXISTS blog_projects (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
 
-    -- 레퍼런스 정보
+    -- 레퍼런스 정보 (본문은 blog_references에 저장, reference_text는 이전 데이터 호환용)
     reference_url TEXT,
-    reference_text TEXT NOT NULL,
+    reference_text TEXT,
+    reference_id UUID REFERENCES blog_references(id) ON DELETE SET NULL,
 
-    -- 분석 결과
+    -- 분석 결과 (본문은 blog_analyses에 저장, analysis_result는 이전 데이터 호환용)
     analysis_result TEXT,
+    analysis_id UUID REFERENCES blog_analyses(id) ON DELETE SET NULL,
 
     -- 생성 정보
     topic TEXT NOT NULL,
@@ -19,13 +57,88 @@ CREATE TABLE IF NOT EXISTS blog_projects (
 
     -- 메타데이터
     status TEXT DEFAULT 'draft' CHECK (status IN ('draft', 'analyzing', 'generating', 'completed')),
-    tags TEXT[]
+    tags TEXT[],
+
+    -- 여러 레퍼런스로 분석한 경우 병합된 스타일 프로필
+    style_profile_id UUID REFERENCES style_profiles(id) ON DELETE SET NULL
 );
 
+-- 기존 테이블에 컬럼 추가 (이미 생성된 경우)
+ALTER TABLE blog_projects ADD COLUMN IF NOT EXISTS style_profile_id UUID REFERENCES style_profiles(id) ON DELETE SET NULL;
+
 -- 인덱스 생성
 CREATE INDEX IF NOT EXISTS idx_blog_projects_created_at ON blog_projects(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_blog_projects_status ON blog_projects(status);
 CREATE INDEX IF NOT EXISTS idx_blog_projects_topic ON blog_projects USING gin(to_tsvector('korean', topic));
+CREATE INDEX IF NOT EXISTS idx_blog_projects_style_profile_id ON blog_projects(style_profile_id);
+CREATE INDEX IF NOT EXISTS idx_blog_projects_reference_id ON blog_projects(reference_id);
+CREATE INDEX IF NOT EXISTS idx_blog_projects_analysis_id ON blog_projects(analysis_id);
+CREATE INDEX IF NOT EXISTS idx_blog_projects_tags ON blog_projects USING gin(tags);
+CREATE INDEX IF NOT EXISTS idx_blog_analyses_reference_id ON blog_analyses(reference_id);
+
+-- 키워드 (공백 제거 + 소문자로 정규화한 값이 keyword, 처음 입력된 표기가 label)
+CREATE TABLE IF NOT EXISTS keywords (
+    id BIGSERIAL PRIMARY KEY,
+    keyword TEXT NOT NULL UNIQUE,
+    label TEXT NOT NULL
+);
+
+-- 프로젝트-키워드 연결
+CREATE TABLE IF NOT EXISTS project_keywords (
+    project_id UUID NOT NULL REFERENCES blog_projects(id) ON DELETE CASCADE,
+    keyword_id BIGINT NOT NULL REFERENCES keywords(id) ON DELETE CASCADE,
+    position SMALLINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (project_id, keyword_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_project_keywords_keyword_id ON project_keywords(keyword_id);
+
+-- 모델 호출별 생성 지표
+CREATE TABLE IF NOT EXISTS generation_metrics (
+    id BIGSERIAL PRIMARY KEY,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+    project_id UUID NOT NULL REFERENCES blog_projects(id) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    model TEXT NOT NULL,
+    latency_ms INTEGER,
+    ttft_ms INTEGER,
+    prompt_tokens INTEGER,
+    output_tokens INTEGER,
+    route_reason TEXT,
+    fallback_from TEXT,
+    cost_usd NUMERIC(12, 6)
+);
+
+CREATE INDEX IF NOT EXISTS idx_generation_metrics_project_id ON generation_metrics(project_id);
+CREATE INDEX IF NOT EXISTS idx_generation_metrics_model_created_at ON generation_metrics(model, created_at DESC);
+
+-- 프로젝트별 본문 버전 기록 (전체 본문 또는 직전 버전 대비 줄 단위 변경분)
+CREATE TABLE IF NOT EXISTS blog_revisions (
+    id BIGSERIAL PRIMARY KEY,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+    project_id UUID NOT NULL REFERENCES blog_projects(id) ON DELETE CASCADE,
+    revision INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    kind TEXT NOT NULL CHECK (kind IN ('full', 'delta')),
+    content TEXT,
+    delta JSONB,
+    content_hash TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    UNIQUE (project_id, revision)
+);
+
+-- 레퍼런스/분석 본문을 합쳐서 보여주는 조회용 뷰
+CREATE OR REPLACE VIEW blog_projects_full WITH (security_invoker = true) AS
+SELECT
+    p.id, p.created_at, p.updated_at,
+    COALESCE(p.reference_url, r.reference_url) AS reference_url,
+    COALESCE(p.reference_text, r.reference_text) AS reference_text,
+    COALESCE(p.analysis_result, a.analysis_result) AS analysis_result,
+    p.topic, p.keywords, p.requirements, p.generated_content,
+    p.status, p.tags, p.style_profile_id, p.reference_id, p.analysis_id
+FROM blog_projects p
+LEFT JOIN blog_references r ON r.id = p.reference_id
+LEFT JOIN blog_analyses a ON a.id = p.analysis_id;
 
 -- 업데이트 시간 자동 갱신 트리거
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -57,3 +170,30 @@ CREATE POLICY "Enable update access for all users" ON blog_projects
 -- 모든 사용자가 삭제 가능
 CREATE POLICY "Enable delete access for all users" ON blog_projects
     FOR DELETE USING (true);
+
+-- style_profiles RLS
+ALTER TABLE style_profiles ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable read access for all users" ON style_profiles
+    FOR SELECT USING (true);
+
+CREATE POLICY "Enable insert access for all users" ON style_profiles
+    FOR INSERT WITH CHECK (true);
+
+CREATE POLICY "Enable update access for all users" ON style_profiles
+    FOR UPDATE USING (true);
+
+-- 정규화 테이블 RLS (blog_projects와 같은 정책)
+ALTER TABLE blog_references ENABLE ROW LEVEL SECURITY;
+ALTER TABLE blog_analyses ENABLE ROW LEVEL SECURITY;
+ALTER TABLE keywords ENABLE ROW LEVEL SECURITY;
+ALTER TABLE project_keywords ENABLE ROW LEVEL SECURITY;
+ALTER TABLE generation_metrics ENABLE ROW LEVEL SECURITY;
+ALTER TABLE blog_revisions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable all access for all users" ON blog_references FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Enable all access for all users" ON blog_analyses FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Enable all access for all users" ON keywords FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Enable all access for all users" ON project_keywords FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Enable all access for all users" ON generation_metrics FOR ALL USING (true) WITH CHECK (true);
+CREATE POLICY "Enable all access for all users" ON blog_revisions FOR ALL USING (true) WITH CHECK (true);